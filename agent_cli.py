@@ -13,49 +13,41 @@ Provides a rich, conversational interface with:
 import asyncio
 import json
 import sys
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Deque, Tuple
 
+# Only the console and prompt are needed before the first keystroke; the
+# remaining Rich renderables and the agent stack are imported on first use
 from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.syntax import Syntax
-from rich.markdown import Markdown
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich import box
 from rich.prompt import Prompt
 
-from agent_main import AgentScraper
-from utils import logger
+from config import settings
+from utils import logger, json_dumps, run_blocking_input, install_uvloop
 
+if TYPE_CHECKING:
+    from rich.panel import Panel
+    from rich.table import Table
+    from agent_main import AgentScraper
 
-class EnhancedAgentCLI:
-    """Enhanced CLI interface for the web scraper agent"""
 
-    def __init__(self):
-        self.console = Console()
-        self.agent: Optional[AgentScraper] = None
-        self.session_data: List[Dict[str, Any]] = []
-        self.start_time = datetime.now()
+# Pre-computed ANSI codes for the per-turn prompt (bypasses Rich markup parsing)
+_CYAN_BOLD = "\033[1;36m"
+_RESET = "\033[0m"
 
-    def print_banner(self):
-        """Display welcome banner"""
-        banner = """
+# Above this size, JSON is shown as plain text instead of syntax-highlighted
+MAX_HIGHLIGHT_CHARS = 8192
+
+BANNER_MARKDOWN = """
 # 🤖 Intelligent Web Scraper Agent
 ## Powered by Claude Sonnet 4.5 + Exa Search
 
 Talk to me naturally to scrape any website!
-        """
-        self.console.print(Panel(
-            Markdown(banner),
-            border_style="cyan",
-            box=box.DOUBLE
-        ))
+"""
 
-    def print_help(self):
-        """Display help information"""
-        help_text = """
+HELP_MARKDOWN = """
 ## Available Commands
 
 - `/help` - Show this help message
@@ -78,51 +70,121 @@ Talk to me naturally to scrape any website!
 - The agent can only scrape ONE page at a time
 - If your request is vague, the agent will ask for clarification
 - You can refine results through follow-up questions
-        """
-        self.console.print(Panel(
-            Markdown(help_text),
-            title="Help",
-            border_style="blue"
-        ))
+"""
 
-    def print_examples(self):
-        """Display example usage"""
-        examples = Table(
-            title="💡 Example Conversations",
-            border_style="green",
-            box=box.ROUNDED
-        )
-        examples.add_column("Scenario", style="cyan", no_wrap=True)
-        examples.add_column("What to say", style="yellow")
+EXAMPLE_CONVERSATIONS = [
+    ("Find a product", "I want to scrape the Nike Air Max 90 product details"),
+    ("Scrape a URL", "Scrape https://news.ycombinator.com for top stories"),
+    ("Search & scrape", "Find and scrape tech news from TechCrunch"),
+    ("Refine results", "Only show articles from this week with summaries"),
+]
+
+
+# Static renderables are built once and reused; Rich renderables are not
+# mutated by rendering, so re-printing the same object is safe
+@lru_cache(maxsize=None)
+def _banner_panel() -> "Panel":
+    from rich import box
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    return Panel(
+        Markdown(BANNER_MARKDOWN),
+        border_style="cyan",
+        box=box.DOUBLE
+    )
 
-        examples.add_row(
-            "Find a product",
-            "I want to scrape the Nike Air Max 90 product details"
-        )
-        examples.add_row(
-            "Scrape a URL",
-            "Scrape https://news.ycombinator.com for top stories"
-        )
-        examples.add_row(
-            "Search & scrape",
-            "Find and scrape tech news from TechCrunch"
+
+@lru_cache(maxsize=None)
+def _help_panel() -> "Panel":
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    return Panel(
+        Markdown(HELP_MARKDOWN),
+        title="Help",
+        border_style="blue"
+    )
+
+
+@lru_cache(maxsize=None)
+def _examples_table() -> "Table":
+    from rich import box
+    from rich.table import Table
+
+    examples = Table(
+        title="💡 Example Conversations",
+        border_style="green",
+        box=box.ROUNDED
+    )
+    examples.add_column("Scenario", style="cyan", no_wrap=True)
+    examples.add_column("What to say", style="yellow")
+
+    for scenario, prompt in EXAMPLE_CONVERSATIONS:
+        examples.add_row(scenario, prompt)
+
+    return examples
+
+
+class EnhancedAgentCLI:
+    """Enhanced CLI interface for the web scraper agent"""
+
+    def __init__(self):
+        self.console = Console()
+        self.agent: Optional["AgentScraper"] = None
+        self.session_data: Deque[Dict[str, Any]] = deque(maxlen=settings.MAX_SESSION_ENTRIES)
+        self.start_time = datetime.now()
+        self._duration_cache: Tuple[int, str] = (-1, "")
+        self._line_buffer: List[str] = []
+        self._user_prompt = (
+            f"\n{_CYAN_BOLD}🧑 You{_RESET}: " if self.console.is_terminal else "\n🧑 You: "
         )
-        examples.add_row(
-            "Refine results",
-            "Only show articles from this week with summaries"
+
+    async def _read_user_input(self) -> str:
+        """Prompt for the next message with a plain stdout write + readline"""
+        sys.stdout.write(self._user_prompt)
+        sys.stdout.flush()
+        line = await run_blocking_input(sys.stdin.readline)
+        if not line:
+            raise EOFError
+        return line.strip()
+
+    def _write(self, chunk: str):
+        """Buffer streamed text, flushing to the console on line boundaries"""
+        self._line_buffer.append(chunk)
+        if "\n" in chunk:
+            self._flush()
+
+    def _flush(self):
+        """Render buffered streamed text in a single console.print call"""
+        if not self._line_buffer:
+            return
+        self.console.print(
+            "".join(self._line_buffer),
+            end="",
+            style="white",
+            markup=False,
+            highlight=False
         )
+        self._line_buffer.clear()
+
+    def print_banner(self):
+        """Display welcome banner"""
+        self.console.print(_banner_panel())
 
-        self.console.print(examples)
+    def print_help(self):
+        """Display help information"""
+        self.console.print(_help_panel())
+
+    def print_examples(self):
+        """Display example usage"""
+        self.console.print(_examples_table())
 
     async def initialize_agent(self):
-        """Initialize the agent with progress indicator"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[cyan]Initializing agent..."),
-            console=self.console
-        ) as progress:
-            progress.add_task("init", total=None)
+        """Initialize the agent with a status spinner"""
+        with self.console.status("[cyan]Initializing agent...", spinner="dots"):
             try:
+                from agent_main import AgentScraper
                 self.agent = AgentScraper()
                 self.console.print("✅ [green]Agent initialized successfully![/green]\n")
                 return True
@@ -133,7 +195,7 @@ Talk to me naturally to scrape any website!
                 self.console.print("  2. All dependencies are installed")
                 return False
 
-    def save_conversation(self, filename: Optional[str] = None):
+    async def save_conversation(self, filename: Optional[str] = None):
         """Save conversation to JSON file"""
         if not filename:
             filename = f"conversation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -142,13 +204,15 @@ Talk to me naturally to scrape any website!
             "timestamp": self.start_time.isoformat(),
             "duration_seconds": (datetime.now() - self.start_time).total_seconds(),
             "conversation": self.agent.conversation_history if self.agent else [],
-            "session_data": self.session_data
+            "session_data": list(self.session_data)
         }
 
-        Path(filename).write_text(json.dumps(data, indent=2, ensure_ascii=False))
+        # Write off the event loop so large payloads don't stall rendering
+        payload = json_dumps(data, indent=True)
+        await asyncio.to_thread(Path(filename).write_bytes, payload)
         self.console.print(f"✅ [green]Saved conversation to {filename}[/green]")
 
-    def export_data(self, filename: Optional[str] = None):
+    async def export_data(self, filename: Optional[str] = None):
         """Export scraped data to JSON file"""
         if not self.agent or not self.agent.last_scraped_data:
             self.console.print("[yellow]⚠️  No scraped data to export[/yellow]")
@@ -157,9 +221,8 @@ Talk to me naturally to scrape any website!
         if not filename:
             filename = f"scraped_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
-        Path(filename).write_text(
-            json.dumps(self.agent.last_scraped_data, indent=2, ensure_ascii=False)
-        )
+        payload = json_dumps(self.agent.last_scraped_data, indent=True)
+        await asyncio.to_thread(Path(filename).write_bytes, payload)
         self.console.print(f"✅ [green]Exported data to {filename}[/green]")
 
     def show_history(self):
@@ -168,35 +231,47 @@ Talk to me naturally to scrape any website!
             self.console.print("[yellow]No conversation history yet[/yellow]")
             return
 
-        history_table = Table(
-            title="Conversation History",
-            border_style="blue",
-            box=box.SIMPLE
-        )
-        history_table.add_column("#", style="dim", width=4)
-        history_table.add_column("Role", style="cyan", width=10)
-        history_table.add_column("Message", style="white")
+        # Pre-format fixed-width rows and emit them in a single write;
+        # Rich's Table layout is O(rows x cells) and crawls on long sessions
+        width = 116
+        border = "─" * width
+        lines = [
+            "Conversation History".center(width),
+            border,
+            f"{'#':>4} {'Role':<10} Message",
+            border
+        ]
 
         for i, msg in enumerate(self.agent.conversation_history, 1):
             role = msg["role"].capitalize()
             content = msg["content"]
+            if not isinstance(content, str):
+                content = json.dumps(content, ensure_ascii=False)
+            content = content.replace("\n", " ")
             if len(content) > 100:
                 content = content[:97] + "..."
-            history_table.add_row(str(i), role, content)
+            lines.append(f"{i:>4} {role.ljust(10)} {content}")
 
-        self.console.print(history_table)
+        lines.append(border)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def show_stats(self):
         """Display session statistics"""
         if not self.agent:
             return
 
+        from rich.table import Table
+
         stats = Table(title="Session Statistics", border_style="magenta")
         stats.add_column("Metric", style="cyan")
         stats.add_column("Value", style="yellow")
 
         duration = datetime.now() - self.start_time
-        stats.add_row("Session Duration", str(duration).split('.')[0])
+        seconds = int(duration.total_seconds())
+        if self._duration_cache[0] != seconds:
+            self._duration_cache = (seconds, str(duration).split('.')[0])
+        stats.add_row("Session Duration", self._duration_cache[1])
         stats.add_row("Messages Exchanged", str(len(self.agent.conversation_history)))
         stats.add_row("Scraping Requests", str(len(self.session_data)))
 
@@ -208,10 +283,23 @@ Talk to me naturally to scrape any website!
         self.console.print(stats)
 
     def display_json(self, data: Dict[str, Any], title: str = "Result"):
-        """Display JSON with syntax highlighting"""
+        """Display JSON with syntax highlighting (plain text for large payloads)"""
+        from rich.panel import Panel
+
         json_str = json.dumps(data, indent=2, ensure_ascii=False)
-        syntax = Syntax(json_str, "json", theme="monokai", line_numbers=True)
-        self.console.print(Panel(syntax, title=title, border_style="green"))
+
+        # Pygments lexing is O(chars); skip it for payloads nobody reads in full
+        if len(json_str) > MAX_HIGHLIGHT_CHARS:
+            from rich.text import Text
+            logger.debug(f"Truncating JSON display: {len(json_str)} chars")
+            renderable = Text(
+                json_str[:MAX_HIGHLIGHT_CHARS] + "\n... (truncated, use /export)"
+            )
+        else:
+            from rich.syntax import Syntax
+            renderable = Syntax(json_str, "json", theme="monokai", line_numbers=True)
+
+        self.console.print(Panel(renderable, title=title, border_style="green"))
 
     async def handle_command(self, command: str) -> bool:
         """
@@ -232,10 +320,10 @@ Talk to me naturally to scrape any website!
             self.print_help()
 
         elif cmd == '/save':
-            self.save_conversation(arg)
+            await self.save_conversation(arg)
 
         elif cmd == '/export':
-            self.export_data(arg)
+            await self.export_data(arg)
 
         elif cmd == '/history':
             self.show_history()
@@ -246,7 +334,8 @@ Talk to me naturally to scrape any website!
         elif cmd == '/clear':
             if self.agent:
                 self.agent.conversation_history = []
-                self.session_data = []
+                self.agent.memory_summary = None
+                self.session_data.clear()
             self.console.print("✅ [green]Conversation history cleared[/green]")
 
         elif cmd == '/examples':
@@ -267,7 +356,7 @@ Talk to me naturally to scrape any website!
         while True:
             try:
                 # Get user input
-                user_input = Prompt.ask("\n[bold cyan]🧑 You[/bold cyan]").strip()
+                user_input = await self._read_user_input()
 
                 if not user_input:
                     continue
@@ -284,8 +373,9 @@ Talk to me naturally to scrape any website!
 
                 response_parts = []
                 async for chunk in self.agent.chat(user_input):
-                    self.console.print(chunk, end="", style="white")
+                    self._write(chunk)
                     response_parts.append(chunk)
+                self._flush()
 
                 # Store in session data
                 self.session_data.append({
@@ -303,6 +393,7 @@ Talk to me naturally to scrape any website!
                 self.console.print("\n\n[cyan]👋 Goodbye![/cyan]\n")
                 break
             except Exception as e:
+                self._flush()
                 logger.error(f"Error in chat loop: {e}")
                 self.console.print(f"\n[red]❌ Error: {str(e)}[/red]\n")
 
@@ -322,19 +413,20 @@ Talk to me naturally to scrape any website!
 
         # Offer to save on exit
         if self.agent and self.agent.conversation_history:
-            save = Prompt.ask(
+            save = await run_blocking_input(
+                Prompt.ask,
                 "\n[yellow]Save conversation before exiting?[/yellow]",
                 choices=["y", "n"],
                 default="n"
             )
             if save == "y":
-                self.save_conversation()
+                await self.save_conversation()
 
         return 0
 
 
-async def main():
-    """CLI entry point"""
+def parse_args():
+    """Parse command line arguments"""
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -356,9 +448,15 @@ Examples:
         help="Enable verbose logging"
     )
 
-    args = parser.parse_args()
+    return parser.parse_args()
+
+
+async def main():
+    """CLI entry point"""
+    # No flags: skip building the argparse parser entirely
+    verbose = parse_args().verbose if len(sys.argv) > 1 else False
 
-    if args.verbose:
+    if verbose:
         logger.setLevel("DEBUG")
     else:
         # Keep internal logs hidden for clean user experience
@@ -369,6 +467,7 @@ Examples:
 
 
 if __name__ == "__main__":
+    install_uvloop()
     try:
         exit_code = asyncio.run(main())
         sys.exit(exit_code)
@@ -6,11 +6,17 @@ Uses Anthropic SDK to provide natural language scraping through conversational A
 """
 import asyncio
 import json
+import sys
 from typing import AsyncGenerator, Optional, List, Dict, Any
 from anthropic import Anthropic, AsyncAnthropic
 
+from agent_tools import understand_intent, web_search, scrape_url, scrape_urls_batch
 from config import settings
-from utils import logger
+from utils import logger, json_dumps, json_loads, run_blocking_input, install_uvloop
+
+
+# Minimum size of streamed text chunks (smaller pieces are coalesced)
+STREAM_CHUNK_CHARS = 64
 
 
 class AgentScraper:
@@ -33,11 +39,30 @@ class AgentScraper:
         
         # Tool definitions
         self.tools = self._get_tool_definitions()
+        self._tool_dispatch = {
+            "understand_intent": understand_intent,
+            "web_search": web_search,
+            "scrape_url": scrape_url,
+            "scrape_urls_batch": scrape_urls_batch,
+        }
+
+        # System prompt is static; build it once and mark it cacheable so
+        # every tool-loop iteration reuses Anthropic's cached prefix
+        self._system_prompt = self._get_system_prompt()
+        self._system_blocks = [{
+            "type": "text",
+            "text": self._system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
 
         # Conversation state
         self.conversation_history: List[Dict[str, Any]] = []
         self.last_scraped_data: Optional[Dict[str, Any]] = None
 
+        # Rolling summary of turns dropped from the history window
+        self.memory_summary: Optional[str] = None
+        self._summary_task: Optional[asyncio.Task] = None
+
         logger.info("✅ Agent initialized successfully")
 
     def _get_tool_definitions(self) -> List[Dict[str, Any]]:
@@ -81,6 +106,20 @@ class AgentScraper:
                     },
                     "required": ["url", "extraction_query"]
                 }
+            },
+            {
+                "name": "scrape_urls_batch",
+                "description": "Extract the same structured data from several specific URLs concurrently",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "urls": {"type": "array", "items": {"type": "string"}, "description": "Target URLs to scrape"},
+                        "extraction_query": {"type": "string", "description": "What to extract from each page"},
+                        "prefer_css": {"type": "boolean", "description": "Prefer CSS extraction"},
+                        "skip_validation": {"type": "boolean", "description": "Skip validation"}
+                    },
+                    "required": ["urls", "extraction_query"]
+                }
             }
         ]
 
@@ -98,9 +137,10 @@ class AgentScraper:
 - `understand_intent`: Analyze user's request to determine what they want
 - `web_search`: Find URLs when not provided by the user
 - `scrape_url`: Extract data from a specific URL
+- `scrape_urls_batch`: Extract the same data from several exact URLs at once (only when the user has provided or confirmed each URL)
 
 **CRITICAL LIMITATION - READ CAREFULLY:**
-- You can only scrape ONE webpage at a time
+- You can only scrape ONE webpage at a time (unless the user gives several exact URLs, see `scrape_urls_batch`)
 - Each scrape extracts data from a SINGLE URL only
 - If a user asks for multiple products/items, you MUST:
   1. Ask which specific item they want
@@ -143,6 +183,157 @@ class AgentScraper:
 - Be concise but informative
 - Never promise to scrape multiple pages - you can only do one at a time"""
 
+    @staticmethod
+    def _approx_tokens(message: Dict[str, Any]) -> int:
+        """Rough token count for a message (~4 characters per token)"""
+        content = message["content"]
+        if isinstance(content, str):
+            return len(content) // 4
+        return sum(len(json_dumps(block)) for block in content) // 4
+
+    def _trim_history_to_budget(self):
+        """
+        Drop the oldest messages until history fits the token budget.
+
+        Budget is 80% of the context window minus the system prompt and the
+        response allowance. Recent messages are kept verbatim, and the latest
+        message is always kept even if it alone exceeds the budget.
+        """
+        history = self.conversation_history
+        budget = (
+            int(0.8 * settings.CLAUDE_CONTEXT_WINDOW)
+            - len(self._system_prompt) // 4
+            - settings.CLAUDE_MAX_TOKENS
+        )
+
+        total = 0
+        keep_from = len(history)
+        while keep_from > 0:
+            total += self._approx_tokens(history[keep_from - 1])
+            if total > budget and keep_from < len(history):
+                break
+            keep_from -= 1
+
+        # The API requires the conversation to open with a user turn
+        while keep_from < len(history) - 1 and history[keep_from]["role"] != "user":
+            keep_from += 1
+
+        if keep_from:
+            logger.debug(f"Trimmed {keep_from} messages to fit token budget ({budget} tokens)")
+            del history[:keep_from]
+
+    def _system_with_memory(self) -> List[Dict[str, Any]]:
+        """System blocks plus the conversation summary (after the cached prefix)"""
+        if not self.memory_summary:
+            return self._system_blocks
+        return self._system_blocks + [{
+            "type": "text",
+            "text": f"**Summary of earlier conversation:**\n{self.memory_summary}"
+        }]
+
+    async def _summarize_history(self):
+        """
+        Fold the oldest half of the history into the rolling summary.
+
+        Uses the fast intent model; on failure history is left as is and the
+        normal MAX_CONVERSATION_HISTORY / token budget trimming applies.
+        """
+        history = self.conversation_history
+        cut = len(history) // 2
+        # Keep the remaining history starting with a user turn
+        while cut < len(history) and history[cut]["role"] != "user":
+            cut += 1
+        if cut == 0 or cut >= len(history):
+            return
+
+        transcript = "\n".join(
+            f"{msg['role'].upper()}: {msg['content']}"
+            for msg in history[:cut]
+            if isinstance(msg["content"], str)
+        )
+        previous = f"Existing summary:\n{self.memory_summary}\n\n" if self.memory_summary else ""
+
+        try:
+            response = await self.client.messages.create(
+                model=settings.INTENT_MODEL,
+                max_tokens=300,
+                messages=[{
+                    "role": "user",
+                    "content": f"""{previous}Conversation turns:
+{transcript}
+
+Summarize the existing summary and these turns into at most 200 tokens of durable facts (URLs, sites, products, extraction requests, user preferences, results). Return only the summary."""
+                }]
+            )
+            if history is not self.conversation_history:
+                return  # Conversation was cleared meanwhile
+            self.memory_summary = response.content[0].text.strip()
+            # History may have grown while summarizing; drop only what was summarized
+            del history[:cut]
+            logger.debug(f"Summarized {cut} messages into conversation memory")
+        except Exception as e:
+            logger.warning(f"History summarization failed: {e}")
+
+    @staticmethod
+    def _with_cache_breakpoint(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Return messages with a prompt-cache breakpoint on the final message.
+
+        The breakpoint is applied to a copy so earlier iterations don't
+        accumulate markers (the API allows at most four per request).
+        """
+        if not messages:
+            return messages
+
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            blocks = [{"type": "text", "text": content}]
+        else:
+            blocks = list(content)
+        blocks[-1] = {**blocks[-1], "cache_control": {"type": "ephemeral"}}
+
+        return messages[:-1] + [{"role": last["role"], "content": blocks}]
+
+    async def _run_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a single tool call, converting failures into error results"""
+        try:
+            handler = self._tool_dispatch.get(tool_name)
+            if not handler:
+                return {
+                    "content": [{"type": "text", "text": f"Unknown tool: {tool_name}"}],
+                    "is_error": True
+                }
+
+            tool_result = await handler(tool_input)
+
+            if tool_name == "scrape_url":
+                # Store scraped data (decode the text only if no parsed copy)
+                result_data = tool_result.get("_parsed")
+                if result_data is None:
+                    result_data = json_loads(tool_result["content"][0]["text"])
+                if result_data.get("success"):
+                    self.last_scraped_data = result_data.get("data")
+
+            elif tool_name == "scrape_urls_batch":
+                # Store successful results keyed by URL
+                scraped = {
+                    result["url"]: result.get("data")
+                    for result in tool_result["_parsed"]["results"]
+                    if result.get("success")
+                }
+                if scraped:
+                    self.last_scraped_data = scraped
+
+            return tool_result
+
+        except Exception as e:
+            logger.error(f"Tool execution error: {e}")
+            return {
+                "content": [{"type": "text", "text": f"Tool error: {str(e)}"}],
+                "is_error": True
+            }
+
     async def chat(self, user_message: str) -> AsyncGenerator[str, None]:
         """
         Send a message to the agent and get streaming response.
@@ -153,25 +344,29 @@ class AgentScraper:
         Yields:
             Chunks of the agent's response
         """
-        from agent_tools import understand_intent, web_search, scrape_url
-        
+        # Let a pending summarization finish before touching history
+        if self._summary_task:
+            await self._summary_task
+            self._summary_task = None
+
         # Add to conversation history
         self.conversation_history.append({
             "role": "user",
             "content": user_message
         })
 
-        # Truncate history if too long
+        # Truncate history if too long (in place, no copy on the common path)
         if len(self.conversation_history) > settings.MAX_CONVERSATION_HISTORY:
-            # Keep system context but trim old messages
-            self.conversation_history = self.conversation_history[-settings.MAX_CONVERSATION_HISTORY:]
+            del self.conversation_history[:-settings.MAX_CONVERSATION_HISTORY]
+        self._trim_history_to_budget()
 
         # User message logged at debug level only
         logger.debug(f"User: {user_message}")
 
         try:
-            # Create messages for API call
-            messages = self.conversation_history.copy()
+            # Shallow copy once: tool interactions are appended to this list
+            # only, never to the stored history
+            messages = self.conversation_history[:]
             
             # Tool execution loop
             max_iterations = 10
@@ -185,92 +380,81 @@ class AgentScraper:
                     model=settings.CLAUDE_MODEL,
                     max_tokens=settings.CLAUDE_MAX_TOKENS,
                     temperature=settings.CLAUDE_TEMPERATURE,
-                    system=self._get_system_prompt(),
-                    messages=messages,
+                    system=self._system_with_memory(),
+                    messages=self._with_cache_breakpoint(messages),
                     tools=self.tools
                 )
                 
-                # Process response
+                # Process the whole response: stream every text block and
+                # collect every tool call so they can run in one batch
                 assistant_content = []
-                needs_tool_execution = False
-                
+                tool_uses = []
+                pending: List[str] = []
+                pending_chars = 0
+
                 for block in response.content:
                     if block.type == "text":
-                        # Stream text to user
-                        yield block.text
+                        # Stream text to user, coalesced into larger chunks
+                        pending.append(block.text)
+                        pending_chars += len(block.text)
+                        if pending_chars >= STREAM_CHUNK_CHARS or "\n" in block.text:
+                            yield "".join(pending)
+                            pending.clear()
+                            pending_chars = 0
                         assistant_content.append({"type": "text", "text": block.text})
-                    
+
                     elif block.type == "tool_use":
-                        needs_tool_execution = True
-                        tool_name = block.name
-                        tool_input = block.input
-                        tool_use_id = block.id
-                        
-                        logger.debug(f"🔧 Tool called: {tool_name}")
-                        
-                        # Execute tool
-                        try:
-                            if tool_name == "understand_intent":
-                                tool_result = await understand_intent(tool_input)
-                            elif tool_name == "web_search":
-                                tool_result = await web_search(tool_input)
-                            elif tool_name == "scrape_url":
-                                tool_result = await scrape_url(tool_input)
-                                # Store scraped data
-                                result_data = json.loads(tool_result["content"][0]["text"])
-                                if result_data.get("success"):
-                                    self.last_scraped_data = result_data.get("data")
-                            else:
-                                tool_result = {
-                                    "content": [{"type": "text", "text": f"Unknown tool: {tool_name}"}],
-                                    "is_error": True
-                                }
-                        except Exception as e:
-                            logger.error(f"Tool execution error: {e}")
-                            tool_result = {
-                                "content": [{"type": "text", "text": f"Tool error: {str(e)}"}],
-                                "is_error": True
-                            }
-                        
-                        # Add tool use and result to assistant content
+                        logger.debug(f"🔧 Tool called: {block.name}")
+                        tool_uses.append(block)
                         assistant_content.append({
                             "type": "tool_use",
-                            "id": tool_use_id,
-                            "name": tool_name,
-                            "input": tool_input
+                            "id": block.id,
+                            "name": block.name,
+                            "input": block.input
                         })
-                        
-                        # Add tool result to messages for next iteration
-                        messages.append({
-                            "role": "assistant",
-                            "content": assistant_content
-                        })
-                        messages.append({
-                            "role": "user",
-                            "content": [{
-                                "type": "tool_result",
-                                "tool_use_id": tool_use_id,
-                                "content": tool_result["content"][0]["text"]
-                            }]
-                        })
-                        
-                        # Reset assistant_content for next iteration
-                        assistant_content = []
-                        break  # Go to next iteration
-                
+
+                if pending:
+                    yield "".join(pending)
+
                 # If no tool execution needed, we're done
-                if not needs_tool_execution:
+                if not tool_uses:
                     # Store final assistant message
-                    if assistant_content:
+                    final_text = "".join(
+                        b["text"] for b in assistant_content if b["type"] == "text"
+                    )
+                    if final_text:
                         self.conversation_history.append({
                             "role": "assistant",
-                            "content": assistant_content[0]["text"] if assistant_content[0]["type"] == "text" else ""
+                            "content": final_text
                         })
+
+                    # Summarize old turns in the background, off this
+                    # response's critical path
+                    if len(self.conversation_history) > settings.SUMMARY_TRIGGER:
+                        self._summary_task = asyncio.create_task(self._summarize_history())
                     break
-                
-                # Check stop reason
-                if response.stop_reason == "end_turn":
-                    break
+
+                # Execute all requested tools concurrently
+                tool_results = await asyncio.gather(
+                    *(self._run_tool(t.name, t.input) for t in tool_uses)
+                )
+
+                # Add tool uses and their results to messages for next iteration
+                messages.append({
+                    "role": "assistant",
+                    "content": assistant_content
+                })
+                messages.append({
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "tool_result",
+                            "tool_use_id": tool_use.id,
+                            "content": tool_result["content"][0]["text"]
+                        }
+                        for tool_use, tool_result in zip(tool_uses, tool_results)
+                    ]
+                })
 
         except Exception as e:
             error_msg = f"❌ Error: {str(e)}"
@@ -296,7 +480,7 @@ class AgentScraper:
         while True:
             try:
                 # Get user input
-                user_input = input("\n🧑 You: ").strip()
+                user_input = (await run_blocking_input(input, "\n🧑 You: ")).strip()
 
                 if not user_input:
                     continue
@@ -405,9 +589,15 @@ Examples:
     if args.query:
         # Single query mode
         try:
-            response = await agent.single_query(args.query)
+            if not args.output:
+                # Batch/CI use: stream straight to stdout, nothing to buffer
+                async for chunk in agent.chat(args.query):
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
+                sys.stdout.write("\n")
+            else:
+                response = await agent.single_query(args.query)
 
-            if args.output:
                 # Save to file
                 output_data = {
                     "query": args.query,
@@ -420,8 +610,6 @@ Examples:
                     json.dump(output_data, f, indent=2, ensure_ascii=False)
 
                 print(f"\n✅ Saved to {args.output}")
-            else:
-                print(response)
 
         except Exception as e:
             print(f"\n❌ Error: {e}")
@@ -439,7 +627,7 @@ Examples:
 
 
 if __name__ == "__main__":
-    import sys
+    install_uvloop()
     try:
         exit_code = asyncio.run(main())
         sys.exit(exit_code)
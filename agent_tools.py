@@ -2,17 +2,119 @@
 Agent Tools Module
 
 Custom tools for the conversational web scraper agent.
-Implements three core tools:
+Implements four core tools:
 1. understand_intent - Analyzes user requests
 2. web_search - Finds URLs using Exa AI
 3. scrape_url - Extracts data from websites
+4. scrape_urls_batch - Extracts data from several websites concurrently
 """
 import json
-from typing import Dict, Any
-from anthropic import Anthropic
+import re
+from typing import Dict, Any, Optional, Tuple
+from anthropic import AsyncAnthropic, BadRequestError
 
 from config import settings
-from utils import logger
+from utils import logger, to_json, TTLCache
+
+
+# Shared Anthropic client, created on first use so importing this module
+# doesn't require an API key; reusing it keeps the HTTP connection pool warm
+_anthropic_client = None
+
+
+def _get_anthropic() -> AsyncAnthropic:
+    """Return the shared AsyncAnthropic client, creating it on first use"""
+    global _anthropic_client
+    if _anthropic_client is None:
+        _anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+    return _anthropic_client
+
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"')]+")
+MIN_INTENT_WORDS = 3  # Messages shorter than this (with no history) need clarification
+
+CLASSIFY_INTENT_TOOL = {
+    "name": "classify_intent",
+    "description": "Record the classified intent of the user's message",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "intent": {
+                "type": "string",
+                "enum": ["search_needed", "url_provided", "clarification_needed", "refinement"]
+            },
+            "url": {"type": ["string", "null"], "description": "Extracted URL or null"},
+            "search_query": {"type": ["string", "null"], "description": "What to search for or null"},
+            "extraction_query": {"type": ["string", "null"], "description": "What to extract"},
+            "needs_clarification": {"type": "boolean"},
+            "clarification_question": {"type": ["string", "null"], "description": "Question to ask the user or null"}
+        },
+        "required": ["intent", "needs_clarification"]
+    }
+}
+
+
+def _fast_intent(user_message: str, conversation_history: str) -> Optional[Dict[str, Any]]:
+    """
+    Classify obvious messages without calling the LLM.
+
+    Args:
+        user_message: The user's natural language input
+        conversation_history: JSON string of previous conversation
+
+    Returns:
+        Intent dict, or None if the message needs LLM classification
+    """
+    match = URL_PATTERN.search(user_message)
+    if match:
+        url = match.group(0).rstrip(".,;:!?")
+        extraction_query = (user_message[:match.start()] + user_message[match.end():]).strip()
+        return {
+            "intent": "url_provided",
+            "url": url,
+            "search_query": None,
+            "extraction_query": extraction_query or "Extract the main content",
+            "needs_clarification": False,
+            "clarification_question": None
+        }
+
+    # Short follow-ups may be refinements of an earlier request
+    has_history = conversation_history not in ("", "[]", None)
+    if not has_history and len(user_message.split()) < MIN_INTENT_WORDS:
+        return {
+            "intent": "clarification_needed",
+            "url": None,
+            "search_query": None,
+            "extraction_query": None,
+            "needs_clarification": True,
+            "clarification_question": "What website or data would you like me to extract? Please share a URL or describe what you're looking for."
+        }
+
+    return None
+
+
+# Latency-optimized ("fast mode") inference for the intent call, which sits on
+# the critical path of every turn. Disabled for the process after the first
+# rejection so unsupported models/accounts don't pay for a failed request twice.
+FAST_MODE_BETA = "fast-mode-2026-02-01"
+_fast_mode_available = True
+
+
+async def _create_intent_message(client: AsyncAnthropic, **request: Any):
+    """Create the intent message, using fast mode when enabled and available"""
+    global _fast_mode_available
+    if settings.USE_LATENCY_OPTIMIZED and _fast_mode_available:
+        try:
+            return await client.messages.create(
+                **request,
+                extra_headers={"anthropic-beta": FAST_MODE_BETA},
+                extra_body={"speed": "fast"}
+            )
+        except BadRequestError as e:
+            _fast_mode_available = False
+            logger.warning(f"Fast mode unavailable for {request.get('model')}, using standard inference: {e}")
+
+    return await client.messages.create(**request)
 
 
 # Tool 1: Intent Understanding
@@ -35,10 +137,14 @@ async def understand_intent(args: Dict[str, Any]) -> Dict[str, Any]:
     logger.info("🧠 Analyzing user intent...")
 
     try:
-        # Use Claude Haiku (fast, cheap) to analyze intent
-        client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        # Cheap heuristics first: obvious cases need no LLM round trip
+        intent_data = _fast_intent(args['user_message'], args.get('conversation_history', '[]'))
 
-        prompt = f"""Analyze this user message and classify the intent.
+        if intent_data is None:
+            # Use Claude Haiku (fast, cheap) for the ambiguous middle
+            client = _get_anthropic()
+
+            prompt = f"""Analyze this user message and classify the intent.
 
 User message: {args['user_message']}
 Conversation history: {args.get('conversation_history', '[]')}
@@ -47,41 +153,28 @@ Determine:
 1. Is a URL provided? If yes, extract it.
 2. If no URL, what should we search for?
 3. What do they want to extract?
-4. Is the request clear or needs clarification?
-
-Return ONLY valid JSON (no markdown, no explanations):
-{{
-    "intent": "search_needed" | "url_provided" | "clarification_needed" | "refinement",
-    "url": "extracted URL or null",
-    "search_query": "what to search for or null",
-    "extraction_query": "what to extract",
-    "needs_clarification": boolean,
-    "clarification_question": "question to ask user or null"
-}}
-"""
-
-        response = client.messages.create(
-            model=settings.INTENT_MODEL,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        # Parse response
-        response_text = response.content[0].text.strip()
-
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
+4. Is the request clear or needs clarification?"""
+
+            # Forcing the classify_intent tool returns an already-parsed dict
+            response = await _create_intent_message(
+                client,
+                model=settings.INTENT_MODEL,
+                max_tokens=500,
+                tools=[CLASSIFY_INTENT_TOOL],
+                tool_choice={"type": "tool", "name": "classify_intent"},
+                messages=[{"role": "user", "content": prompt}]
+            )
 
-        intent_data = json.loads(response_text)
+            intent_data = next(
+                block.input for block in response.content if block.type == "tool_use"
+            )
 
         logger.info(f"   Intent: {intent_data.get('intent')}")
 
         return {
             "content": [{
                 "type": "text",
-                "text": json.dumps(intent_data, indent=2)
+                "text": to_json(intent_data)
             }]
         }
 
@@ -91,15 +184,25 @@ Return ONLY valid JSON (no markdown, no explanations):
         return {
             "content": [{
                 "type": "text",
-                "text": json.dumps({
+                "text": to_json({
                     "intent": "clarification_needed",
                     "needs_clarification": True,
                     "clarification_question": "Could you please rephrase your request? I want to make sure I understand what you need."
-                }, indent=2)
+                })
             }]
         }
 
 
+# Cache of successful Exa searches: (query, search_type, max_results) ->
+# serialized tool text. Repeated and retried queries are common.
+_search_cache = TTLCache(maxsize=1024, ttl=settings.SEARCH_CACHE_TTL)
+
+
+def _search_cache_key(query: str, search_type: str, max_results: int) -> Tuple[str, str, int]:
+    """Normalize search parameters into a cache key"""
+    return (" ".join(query.lower().split()), search_type, int(max_results))
+
+
 # Tool 2: Web Search with Exa
 async def web_search(args: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -129,6 +232,12 @@ async def web_search(args: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"🔍 Searching Exa for: {query}")
     logger.info(f"   Mode: {search_type}, Max results: {max_results}")
 
+    cache_key = _search_cache_key(query, search_type, max_results)
+    cached_text = _search_cache.get(cache_key)
+    if cached_text is not None:
+        logger.info("   ⚡ Using cached search results")
+        return {"content": [{"type": "text", "text": cached_text}]}
+
     try:
         # Check if API key is set
         if not settings.EXA_API_KEY:
@@ -169,16 +278,20 @@ async def web_search(args: Dict[str, Any]) -> Dict[str, Any]:
             except (TypeError, ValueError, AttributeError):
                 cost_value = None
 
+        result_text = to_json({
+            "success": True,
+            "query": query,
+            "search_type": search_results.resolved_search_type if hasattr(search_results, 'resolved_search_type') else search_type,
+            "results": results,
+            "cost": cost_value
+        })
+
+        _search_cache.set(cache_key, result_text)
+
         return {
             "content": [{
                 "type": "text",
-                "text": json.dumps({
-                    "success": True,
-                    "query": query,
-                    "search_type": search_results.resolved_search_type if hasattr(search_results, 'resolved_search_type') else search_type,
-                    "results": results,
-                    "cost": cost_value
-                }, indent=2)
+                "text": result_text
             }]
         }
 
@@ -197,23 +310,52 @@ async def web_search(args: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "content": [{
                 "type": "text",
-                "text": json.dumps({
+                "text": to_json({
                     "success": False,
                     "error": str(e),
                     "suggestion": "Check EXA_API_KEY is set correctly or provide a direct URL"
-                }, indent=2)
+                })
             }],
             "is_error": True
         }
 
 
+def _scrape_response(payload: Dict[str, Any], is_error: bool = False) -> Dict[str, Any]:
+    """
+    Build a scrape_url tool response.
+
+    The parsed payload is kept under "_parsed" so callers can inspect it
+    without decoding the (potentially large) JSON text again.
+    """
+    return {
+        "content": [{
+            "type": "text",
+            "text": to_json(payload)
+        }],
+        "is_error": is_error,
+        "_parsed": payload
+    }
+
+
+# Recent scrape failures by URL (404s, robots blocks, timeouts) so agent
+# retries don't re-crawl a dead URL within the TTL
+_scrape_failure_cache = TTLCache(maxsize=2048, ttl=settings.SCRAPE_FAILURE_TTL)
+
+
+def _scrape_failure(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a failed scrape_url response and remember it for this URL"""
+    _scrape_failure_cache.set(url, payload)
+    return _scrape_response(payload, is_error=True)
+
+
 # Tool 3: Scrape URL
 async def scrape_url(args: Dict[str, Any]) -> Dict[str, Any]:
     """
     Wraps the scraper by running it in a subprocess to avoid event loop conflicts.
 
     This is the bridge between the agent and existing scraper.
-    Runs scraper in isolated subprocess to prevent asyncio/Twisted reactor conflicts.
+    Runs scraper in a pooled, long-lived worker subprocess to prevent
+    asyncio/Twisted reactor conflicts without per-scrape start-up cost.
 
     Args:
         args: Dict containing:
@@ -227,11 +369,16 @@ async def scrape_url(args: Dict[str, Any]) -> Dict[str, Any]:
     """
     import asyncio
     import os
-    import sys
+    from scraper_pool import scraper_pool
 
     url = args["url"]
     extraction_query = args["extraction_query"]
 
+    cached_failure = _scrape_failure_cache.get(url)
+    if cached_failure is not None:
+        logger.info(f"⚡ Skipping recently failed URL: {url}")
+        return _scrape_response(cached_failure, is_error=True)
+
     # Prepare subprocess input
     scraper_input = {
         "url": url,
@@ -254,133 +401,91 @@ async def scrape_url(args: Dict[str, Any]) -> Dict[str, Any]:
 
             result_data = await production_scrape(url=url, query=extraction_query)
 
-            return {
-                "content": [{
-                    "type": "text",
-                    "text": json.dumps({
-                        "success": True,
-                        "url": url,
-                        "data": result_data
-                    }, indent=2)
-                }],
-                "is_error": False
-            }
+            return _scrape_response({
+                "success": True,
+                "url": url,
+                "data": result_data
+            })
 
         else:
-            # Local: Use subprocess to avoid event loop conflicts
-            logger.info(f"🔧 Running scraper in subprocess: {url}")
-
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            scraper_script = os.path.join(script_dir, "scraper_subprocess.py")
-
-            # Run scraper in subprocess
-            process = await asyncio.create_subprocess_exec(
-                sys.executable,
-                scraper_script,
-                json.dumps(scraper_input),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            # Local: Run in a pooled worker subprocess to avoid event loop conflicts
+            logger.info(f"🔧 Running scraper in worker subprocess: {url}")
 
-            # Wait for completion with timeout (120 seconds)
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=120.0
-                )
-
-                # Log stderr for debugging
-                if stderr:
-                    stderr_text = stderr.decode('utf-8')
-                    logger.debug(f"Subprocess stderr: {stderr_text}")
-
+                result = await scraper_pool.run(scraper_input, timeout=120.0)
             except asyncio.TimeoutError:
-                logger.error(f"⏱️  Scraper subprocess timeout after 120s for {url}")
-                process.kill()
-                await process.wait()
-                return {
-                    "content": [{
-                        "type": "text",
-                        "text": json.dumps({
-                            "success": False,
-                            "url": url,
-                            "error": "Scraper timeout (120s exceeded)"
-                        }, indent=2)
-                    }],
-                    "is_error": True
-                }
-
-            # Parse result (local subprocess mode)
-            if process.returncode == 0:
-                stdout_text = stdout.decode('utf-8')
-                logger.debug(f"Subprocess stdout: {stdout_text[:500]}")
-                result = json.loads(stdout_text)
-
-                if result.get("success"):
-                    return {
-                        "content": [{
-                            "type": "text",
-                            "text": json.dumps({
-                                "success": True,
-                                "url": url,
-                                "data": result["data"]
-                            }, indent=2)
-                        }]
-                    }
-                else:
-                    return {
-                        "content": [{
-                            "type": "text",
-                            "text": json.dumps({
-                                "success": False,
-                                "url": url,
-                                "error": result.get("error", "Unknown error"),
-                                "error_type": result.get("error_type", "UnknownError")
-                            }, indent=2)
-                        }],
-                        "is_error": True
-                    }
+                logger.error(f"⏱️  Scraper worker timeout after 120s for {url}")
+                return _scrape_failure(url, {
+                    "success": False,
+                    "url": url,
+                    "error": "Scraper timeout (120s exceeded)"
+                })
+
+            if result.get("success"):
+                return _scrape_response({
+                    "success": True,
+                    "url": url,
+                    "data": result["data"]
+                })
             else:
-                # Non-zero exit code
-                error_output = stderr.decode('utf-8') if stderr else "No error output"
-                logger.error(f"Scraper subprocess failed: {error_output}")
-
-                return {
-                    "content": [{
-                        "type": "text",
-                        "text": json.dumps({
-                            "success": False,
-                            "url": url,
-                            "error": f"Scraper process failed: {error_output[:500]}"
-                        }, indent=2)
-                    }],
-                    "is_error": True
-                }
+                return _scrape_failure(url, {
+                    "success": False,
+                    "url": url,
+                    "error": result.get("error", "Unknown error"),
+                    "error_type": result.get("error_type", "UnknownError")
+                })
 
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse scraper output: {e}")
-        return {
-            "content": [{
-                "type": "text",
-                "text": json.dumps({
-                    "success": False,
-                    "url": url,
-                    "error": f"Invalid JSON from scraper: {str(e)}"
-                }, indent=2)
-            }],
-            "is_error": True
-        }
+        return _scrape_failure(url, {
+            "success": False,
+            "url": url,
+            "error": f"Invalid JSON from scraper: {str(e)}"
+        })
 
     except Exception as e:
         logger.error(f"Scraper subprocess error: {e}")
-        return {
-            "content": [{
-                "type": "text",
-                "text": json.dumps({
-                    "success": False,
-                    "url": url,
-                    "error": f"Unexpected error: {str(e)}"
-                }, indent=2)
-            }],
-            "is_error": True
-        }
+        return _scrape_failure(url, {
+            "success": False,
+            "url": url,
+            "error": f"Unexpected error: {str(e)}"
+        })
+
+
+# Tool 4: Scrape several URLs concurrently
+async def scrape_urls_batch(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scrape several URLs with the same extraction query concurrently.
+
+    Concurrency is bounded by SCRAPE_CONCURRENCY (and, locally, by the
+    scraper worker pool size).
+
+    Args:
+        args: Dict containing:
+            - urls: List of target URLs
+            - extraction_query: Natural language description of what to extract
+            - prefer_css: Prefer CSS extraction (optional, default False)
+            - skip_validation: Skip Pydantic validation (optional, default False)
+
+    Returns:
+        Tool response with one scrape result per URL, in input order
+    """
+    import asyncio
+
+    urls = args["urls"]
+    logger.info(f"🔧 Batch scraping {len(urls)} URLs")
+
+    semaphore = asyncio.Semaphore(settings.SCRAPE_CONCURRENCY)
+
+    async def scrape_one(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            response = await scrape_url({**args, "url": url})
+            return response["_parsed"]
+
+    results = await asyncio.gather(*(scrape_one(url) for url in urls))
+    succeeded = any(result.get("success") for result in results)
+
+    return _scrape_response({
+        "success": succeeded,
+        "results": results
+    }, is_error=not succeeded)
@@ -5,15 +5,22 @@ Serves static HTML and provides API endpoint for chat
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 import asyncio
+import os
 from typing import Optional
 
 # Import agent
 from agent_main import AgentScraper
+from scraper_pool import scraper_pool
+from extraction.unlocker_extractor import aclose_http_client
+from utils import orjson
 
-app = FastAPI(title="Data Intelligence Agent")
+# Serialize responses with orjson when it is installed
+DefaultResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+app = FastAPI(title="Data Intelligence Agent", default_response_class=DefaultResponse)
 
 # Initialize agent
 agent: Optional[AgentScraper] = None
@@ -28,13 +35,23 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Failed to initialize agent: {e}")
 
+    # Warm up scraper workers locally (production uses Web Unlocker instead)
+    if not os.getenv("FLY_APP_NAME"):
+        try:
+            await scraper_pool.start()
+        except Exception as e:
+            print(f"⚠️  Failed to start scraper workers: {e}")
 
-class ChatRequest(BaseModel):
-    message: str
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop scraper workers and close shared HTTP clients"""
+    await scraper_pool.close()
+    await aclose_http_client()
 
-class ChatResponse(BaseModel):
-    response: str
+
+class ChatRequest(BaseModel):
+    message: str
 
 
 class ScrapeRequest(BaseModel):
@@ -73,23 +90,18 @@ async def scrape_direct(request: ScrapeRequest):
         return {"success": False, "error": str(e)}
 
 
-@app.post("/api/chat", response_model=ChatResponse)
+@app.post("/api/chat")
 async def chat(request: ChatRequest):
     """Chat endpoint"""
     if not agent:
         raise HTTPException(status_code=500, detail="Agent not initialized")
 
-    try:
-        # Get agent response
-        response_parts = []
-        async for chunk in agent.chat(request.message):
-            response_parts.append(chunk)
-
-        full_response = "".join(response_parts)
-        return ChatResponse(response=full_response)
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Stream chunks to the client as the agent produces them instead of
+    # buffering the whole reply; agent.chat reports its own errors in-band
+    return StreamingResponse(
+        agent.chat(request.message),
+        media_type="text/plain; charset=utf-8"
+    )
 
 
 # Serve static files
@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Literal, Optional
 
 
@@ -17,17 +17,33 @@ class Settings(BaseSettings):
     CLAUDE_MODEL: str = "claude-sonnet-4-5-20250929"
     CLAUDE_MAX_TOKENS: int = 4096
     CLAUDE_TEMPERATURE: float = 0.0
+    CLAUDE_CONTEXT_WINDOW: int = 200000  # Model context window (tokens), used to budget history
+    LLM_CONCURRENCY: int = 4  # Maximum concurrent Claude extraction calls
 
     # Agent Mode Configuration
     AGENT_MODE: bool = False  # Enable conversational agent interface
     INTENT_MODEL: str = "claude-3-5-haiku-20241022"  # Fast model for intent classification
+    USE_LATENCY_OPTIMIZED: bool = False  # Request fast-mode inference for intent calls (falls back if unsupported)
     MAX_CONVERSATION_HISTORY: int = 20  # Maximum messages to retain in context
+    SUMMARY_TRIGGER: int = 10  # Summarize the oldest half of history past this many messages
+    MAX_SESSION_ENTRIES: int = 500  # Maximum CLI session exchanges kept for /save and /stats
     WEB_SEARCH_MAX_RESULTS: int = 5  # Default number of search results
     EXA_SEARCH_TYPE: Literal["auto", "neural", "keyword"] = "auto"  # Exa search mode
+    SEARCH_CACHE_TTL: int = 3600  # Seconds to reuse identical Exa search results (0 disables)
+    SCRAPER_WORKERS: int = 2  # Long-lived scraper subprocesses kept warm for local scraping
+    SCRAPE_CONCURRENCY: int = 5  # Maximum concurrent scrapes in a batch
+    SCRAPE_FAILURE_TTL: int = 300  # Seconds to short-circuit repeat scrapes of a failed URL (0 disables)
+    LLM_CACHE_TTL: int = 3600  # Seconds to reuse a Claude answer for identical input, query and schema (0 disables)
+    EXTRACTION_CACHE_TTL: int = 300  # Seconds to reuse a successful extraction for the same URL, query and schema (0 disables)
+    CIRCUIT_BREAKER_THRESHOLD: int = 3  # Consecutive 429/503 failures before a domain is fast-failed (0 disables)
+    CIRCUIT_BREAKER_COOLDOWN: int = 60  # Seconds a tripped domain is fast-failed before a single half-open trial request
+    HTTP_FALLBACK_ENABLED: bool = True  # On an empty browser result, try the page's JSON-LD via a plain HTTP GET
+    HTTP_FALLBACK_TIMEOUT: int = 10  # Timeout for the plain HTTP fallback fetch (seconds)
 
     # Web Scraping Configuration
     BROWSER_HEADLESS: bool = True
     BROWSER_TYPE: Literal["chromium", "firefox", "webkit"] = "chromium"
+    BROWSER_CDP_URL: Optional[str] = None  # Attach crawls to an already-running Chromium (e.g. http://localhost:9222) instead of launching one each
     ENABLE_STEALTH: bool = False  # Disabled due to playwright_stealth dependency issue
     # Use UndetectedAdapter instead for better bot detection bypass
 
@@ -45,6 +61,8 @@ class Settings(BaseSettings):
     UNLOCKER_ZONE: Optional[str] = None  # Web Unlocker zone name
     UNLOCKER_ENDPOINT: str = "https://api.brightdata.com/request"  # Web Unlocker API endpoint
     UNLOCKER_TIMEOUT: int = 120  # Timeout for Web Unlocker requests (seconds)
+    PREFER_JSONLD: bool = True  # Skip the Web Unlocker LLM call when page JSON-LD already covers the schema
+    UNLOCKER_CACHE_TTL: int = 900  # Seconds to reuse a Web Unlocker extraction for the same URL and schema (0 disables)
 
     # Performance
     CHUNK_TOKEN_THRESHOLD: int = 2000
@@ -58,9 +76,13 @@ class Settings(BaseSettings):
     IMAGE_WAIT_ENABLED: bool = True  # Wait for images on e-commerce sites
     SCROLL_DELAY: float = 0.5  # Delay between scroll steps (seconds)
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    # Settings are read from the environment once at import and never
+    # mutated; freezing makes that explicit
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        frozen=True
+    )
 
 
 # Global settings instance
@@ -1,13 +1,100 @@
 """
 Content Optimizer - Reduces HTML tokens by 70-90%
 """
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
 import re
+from typing import List
 
 from utils import logger
 
 
+# Markdown cleanup patterns, compiled once
+_RE_EXCESS_NEWLINES = re.compile(r'\n{3,}')
+_RE_EXCESS_SPACES = re.compile(r' {2,}')
+_RE_EMPTY_LINK = re.compile(r'\[]\(.*?\)')
+_RE_LINE_EDGE_SPACES = re.compile(r' *\n *')
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# Markdown rendering of the lxml tree
+_HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_BLOCK_TAGS = frozenset({
+    'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'aside',
+    'blockquote', 'pre', 'form', 'fieldset', 'figure', 'figcaption',
+    'table', 'thead', 'tbody', 'tfoot', 'dl', 'dt', 'dd', 'address',
+    'details', 'summary', 'hr',
+})
+
+
+def _render_children(element: lxml_html.HtmlElement, out: List[str]):
+    """Render an element's text, children and their tails"""
+    if element.text:
+        out.append(_RE_WHITESPACE.sub(' ', element.text))
+    for child in element:
+        _render(child, out)
+        if child.tail:
+            out.append(_RE_WHITESPACE.sub(' ', child.tail))
+
+
+def _render(element: lxml_html.HtmlElement, out: List[str]):
+    """
+    Append the markdown for one element to out.
+    
+    Covers what the LLM needs from page content: headings, paragraphs and
+    other blocks, lists, table rows, links and images. Everything else is
+    rendered as its text.
+    """
+    tag = element.tag
+    if not isinstance(tag, str):
+        return  # Comment or processing instruction
+    
+    if tag in _HEADING_LEVELS:
+        out.append('\n\n' + '#' * _HEADING_LEVELS[tag] + ' ')
+        _render_children(element, out)
+        out.append('\n\n')
+    elif tag == 'br':
+        out.append('\n')
+    elif tag == 'a':
+        parts = []
+        _render_children(element, parts)
+        text = ''.join(parts).strip()
+        href = element.get('href')
+        out.append(f'[{text}]({href})' if text and href else text)
+    elif tag == 'img':
+        src = element.get('src')
+        if src:
+            out.append(f"![{element.get('alt') or ''}]({src})")
+    elif tag in ('ul', 'ol'):
+        out.append('\n\n')
+        number = 0
+        for child in element:
+            if child.tag == 'li':
+                number += 1
+                out.append(f'\n{number}. ' if tag == 'ol' else '\n- ')
+                _render_children(child, out)
+            else:
+                _render(child, out)
+            if child.tail:
+                out.append(_RE_WHITESPACE.sub(' ', child.tail))
+        out.append('\n\n')
+    elif tag == 'li':
+        out.append('\n- ')
+        _render_children(element, out)
+    elif tag == 'tr':
+        out.append('\n|')
+        for cell in element:
+            if cell.tag in ('td', 'th'):
+                parts = []
+                _render_children(cell, parts)
+                out.append(' ' + ''.join(parts).strip() + ' |')
+    elif tag in _BLOCK_TAGS:
+        out.append('\n\n')
+        _render_children(element, out)
+        out.append('\n\n')
+    else:
+        _render_children(element, out)
+
+
 class ContentOptimizer:
     """
     Optimizes HTML content before sending to LLM.
@@ -54,6 +141,13 @@ class ContentOptimizer:
         '.pdp-main',
     ]
     
+    # Parser and selectors are built once; lxml (libxml2) does the heavy
+    # parse/strip/select work in C instead of walking a BeautifulSoup tree
+    _PARSER = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True)
+    # All removal selectors combined into one group so a single pass finds them
+    _REMOVE_MATCHER = CSSSelector(", ".join(REMOVE_SELECTORS))
+    _CONTENT_MATCHERS = list(zip(CONTENT_SELECTORS, map(CSSSelector, CONTENT_SELECTORS)))
+    
     def optimize(self, html: str, query: str) -> str:
         """
         Optimize HTML content for LLM extraction.
@@ -67,23 +161,31 @@ class ContentOptimizer:
         """
         logger.debug("🔧 Optimizing content...")
         
-        soup = BeautifulSoup(html, 'lxml')
+        if not html or not html.strip():
+            return ""
+        
+        try:
+            doc = lxml_html.document_fromstring(html.encode('utf-8'), parser=self._PARSER)
+        except (etree.ParserError, ValueError) as e:
+            # e.g. "Document is empty" for comment-only markup
+            logger.debug(f"   Nothing to optimize: {e}")
+            return ""
         
         # Step 1: Remove useless tags
-        for tag_name in self.REMOVE_TAGS:
-            for tag in soup.find_all(tag_name):
-                tag.decompose()
+        etree.strip_elements(doc, *self.REMOVE_TAGS, with_tail=False)
         
         # Step 2: Remove non-content areas
-        for selector in self.REMOVE_SELECTORS:
-            for element in soup.select(selector):
-                element.decompose()
+        for element in self._REMOVE_MATCHER(doc):
+            element.drop_tree()
         
         # Step 3: Extract main content area
-        main_content = self._extract_main_content(soup)
+        main_content = self._extract_main_content(doc)
         
-        # Step 4: Convert to markdown (more concise)
-        markdown = md(str(main_content), heading_style="ATX")
+        # Step 4: Convert to markdown (more concise) by walking the main
+        # content subtree directly; no serialize-and-reparse round trip
+        parts = []
+        _render(main_content, parts)
+        markdown = ''.join(parts)
         
         # Step 5: Clean up markdown
         markdown = self._clean_markdown(markdown)
@@ -94,32 +196,33 @@ class ContentOptimizer:
         
         return markdown
     
-    def _extract_main_content(self, soup: BeautifulSoup) -> BeautifulSoup:
-        """Extract main content area from soup"""
+    def _extract_main_content(self, doc: lxml_html.HtmlElement) -> lxml_html.HtmlElement:
+        """Extract main content area from the parsed document"""
         # Try content selectors in priority order
-        for selector in self.CONTENT_SELECTORS:
-            content = soup.select_one(selector)
-            if content:
+        for selector, matcher in self._CONTENT_MATCHERS:
+            matches = matcher(doc)
+            if matches:
                 logger.debug(f"   Found main content: {selector}")
-                return content
+                return matches[0]
         
         # Fallback: Use entire body
-        body = soup.find('body')
-        if body:
+        body = doc.find('body')
+        if body is not None:
             return body
         
-        return soup
+        return doc
     
     def _clean_markdown(self, markdown: str) -> str:
         """Clean up markdown output"""
-        # Remove excessive newlines
-        markdown = re.sub(r'\n{3,}', '\n\n', markdown)
+        # Remove excessive spaces, including around line breaks
+        markdown = _RE_EXCESS_SPACES.sub(' ', markdown)
+        markdown = _RE_LINE_EDGE_SPACES.sub('\n', markdown)
         
-        # Remove excessive spaces
-        markdown = re.sub(r' {2,}', ' ', markdown)
+        # Remove excessive newlines
+        markdown = _RE_EXCESS_NEWLINES.sub('\n\n', markdown)
         
         # Remove empty links
-        markdown = re.sub(r'\[]\(.*?\)', '', markdown)
+        markdown = _RE_EMPTY_LINK.sub('', markdown)
         
         # Strip leading/trailing whitespace
         markdown = markdown.strip()
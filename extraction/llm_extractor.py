@@ -1,12 +1,35 @@
 """
 LLM Extractor - Claude-powered extraction with token optimization
 """
+import asyncio
+import copy
+import hashlib
 import json
+import re
 from typing import Dict, Any, Optional
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from config import settings
-from utils import logger
+from utils import logger, to_json, json_dumps, json_loads, TTLCache
+
+
+# Markdown code fence around a JSON payload (```json ... ``` or ``` ... ```)
+_FENCE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+# Bounds concurrent Claude calls across all extractors (rate limits); created
+# lazily so it binds to the event loop that runs the spiders
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(settings.LLM_CONCURRENCY)
+    return _llm_semaphore
+
+# Claude answers keyed by a hash of everything that shapes them; site
+# templates often repeat identical structured data across pages
+_response_cache = TTLCache(maxsize=1024, ttl=settings.LLM_CACHE_TTL)
 
 
 class ScrapyLLMExtractor:
@@ -22,7 +45,7 @@ class ScrapyLLMExtractor:
     
     def __init__(
         self,
-        anthropic_client: Anthropic,
+        anthropic_client: AsyncAnthropic,
         json_schema: Dict[str, Any],
         query: str
     ):
@@ -30,6 +53,14 @@ class ScrapyLLMExtractor:
         self.json_schema = json_schema
         self.query = query
         self.model = settings.CLAUDE_MODEL
+        # The schema is the stable prefix shared by every call for this
+        # extractor; keep it in a cached system block and send only the
+        # per-request content in the user turn
+        self._system_blocks = [{
+            "type": "text",
+            "text": self._build_system_prompt(),
+            "cache_control": {"type": "ephemeral"}
+        }]
     
     async def extract(self, content: str) -> Optional[Dict[str, Any]]:
         """
@@ -45,21 +76,33 @@ class ScrapyLLMExtractor:
             logger.debug(f"🤖 Calling Claude for extraction...")
             logger.debug(f"   Content size: {len(content)} bytes (~{len(content)//4} tokens)")
             
+            # Keyed on the content itself, so re-crawls of an unchanged page
+            # (or identical template pages) skip the call
+            cache_key = self._cache_key("extract", content.encode("utf-8"), self.query)
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("   ♻️  Using cached extraction")
+                return copy.deepcopy(cached)
+            
             prompt = self._build_extraction_prompt(content)
             
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                temperature=0.0,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            async with _get_llm_semaphore():
+                response = await self.client.messages.create(
+                    model=self.model,
+                    max_tokens=4096,
+                    temperature=0.0,
+                    system=self._system_blocks,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ]
+                )
             
             result_text = response.content[0].text.strip()
             
             # Extract JSON from response
             extracted = self._parse_json_response(result_text)
+            if extracted:
+                _response_cache.set(cache_key, copy.deepcopy(extracted))
             
             logger.debug(f"   ✅ Extraction successful")
             return extracted
@@ -84,28 +127,34 @@ class ScrapyLLMExtractor:
         try:
             logger.debug(f"🔄 Converting structured data...")
             
-            prompt = f"""Convert this structured data to match the user's query.
+            cache_key = self._cache_key("convert", json_dumps(structured_data, sort_keys=True), query)
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("   ♻️  Using cached conversion")
+                return copy.deepcopy(cached)
+            
+            prompt = f"""Convert this structured data (JSON-LD, meta tags) to match the user's query.
 
 User Query: {query}
 
 Structured Data:
-{json.dumps(structured_data, indent=2)}
+{to_json(structured_data)}
 
-Target JSON Schema:
-{json.dumps(self.json_schema, indent=2)}
-
-Extract the requested fields and return ONLY valid JSON matching the target schema.
-If a field is not available, omit it or use null."""
+Extract the requested fields. If a field is not available, omit it or use null."""
             
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                temperature=0.0,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            async with _get_llm_semaphore():
+                response = await self.client.messages.create(
+                    model=self.model,
+                    max_tokens=2000,
+                    temperature=0.0,
+                    system=self._system_blocks,
+                    messages=[{"role": "user", "content": prompt}]
+                )
             
             result_text = response.content[0].text.strip()
             extracted = self._parse_json_response(result_text)
+            if extracted:
+                _response_cache.set(cache_key, copy.deepcopy(extracted))
             
             logger.debug(f"   ✅ Conversion successful")
             return extracted
@@ -114,30 +163,42 @@ If a field is not available, omit it or use null."""
             logger.error(f"   ❌ Structured data conversion failed: {e}")
             return None
     
+    def _cache_key(self, kind: str, payload: bytes, query: str) -> str:
+        """Hash the model, schema prompt, query and input into a cache key"""
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (kind, self.model, self._system_blocks[0]["text"], query):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(payload)
+        return digest.hexdigest()
+    
+    def _build_system_prompt(self) -> str:
+        """Build the query-independent system prompt with the schema"""
+        return f"""You extract data from web pages according to a JSON schema.
+
+JSON Schema:
+{to_json(self.json_schema)}
+
+Return ONLY valid JSON matching the schema above. Do not include explanations."""
+    
     def _build_extraction_prompt(self, content: str) -> str:
-        """Build extraction prompt with schema"""
+        """Build the per-request extraction prompt"""
         return f"""Extract data from this page according to the schema.
 
 Query: {self.query}
 
-JSON Schema:
-{json.dumps(self.json_schema, indent=2)}
-
 Page Content:
-{content}
-
-Return ONLY valid JSON matching the schema above. Do not include explanations."""
+{content}"""
     
     def _parse_json_response(self, text: str) -> Optional[Dict[str, Any]]:
         """Parse JSON from LLM response"""
         # Remove markdown code blocks if present
-        if '```json' in text:
-            text = text.split('```json')[1].split('```')[0].strip()
-        elif '```' in text:
-            text = text.split('```')[1].split('```')[0].strip()
+        match = _FENCE.search(text)
+        if match:
+            text = match.group(1)
         
         try:
-            return json.loads(text)
+            return json_loads(text)
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON: {e}")
             logger.debug(f"Raw response: {text[:200]}...")
@@ -4,9 +4,104 @@ FREE extraction (0 LLM tokens)
 """
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
 
-from utils import logger
+from lxml import etree, html as lxml_html
+
+from utils import logger, json_loads
+
+
+# One parse serves every source; lxml (libxml2) handles attributes in any
+# order and never matches markup-like text inside scripts or JSON
+_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+# Elements carrying any of the data-* attributes we collect
+_DATA_ATTR_XPATH = etree.XPath(
+    "//*[@data-price or @data-name or @data-id or @data-sku"
+    " or @*[starts-with(name(), 'data-product-')]]"
+)
+_DATA_ATTR_KEYS = {
+    'data-price': 'price',
+    'data-name': 'name',
+    'data-id': 'id',
+    'data-sku': 'sku',
+}
+
+# Cheap raw-HTML probes: a source whose marker never appears can't yield
+# anything, so its tree walk (or the whole parse) is skipped
+_JSONLD_PROBE = re.compile(r'ld\+json', re.IGNORECASE)
+_META_PROBE = re.compile(r'<meta\b', re.IGNORECASE)
+_DATA_ATTR_PROBE = re.compile(r'data-(?:price|name|id|sku|product-)', re.IGNORECASE)
+
+_STANDARD_META_NAMES = frozenset({'description', 'keywords', 'author', 'price', 'availability'})
+
+_RELEVANT_SCHEMAS = frozenset({
+    'Product', 'Article', 'NewsArticle', 'BlogPosting',
+    'JobPosting', 'Review', 'Organization', 'Person',
+    'Event', 'Recipe', 'Book', 'Movie'
+})
+_RELEVANT_SCHEMA_RE = re.compile('|'.join(sorted(_RELEVANT_SCHEMAS)))
+_RELEVANT_SCHEMA_RE_BYTES = re.compile('|'.join(sorted(_RELEVANT_SCHEMAS)).encode())
+
+# Blocks larger than this are pre-scanned for a relevant type name before
+# the full JSON parse (catalog dumps can be megabytes of irrelevant data)
+_JSONLD_PRESCAN_SIZE = 4096
+
+
+def iter_jsonld_blocks(html: bytes) -> Iterator[bytes]:
+    """
+    Yield the raw contents of <script type="application/ld+json"> blocks.
+    
+    A literal scan with bytes.find (memchr/memmem in C) that jumps between
+    "ld+json" markers, so callers that only need JSON-LD can skip parsing
+    the whole document.
+    
+    Args:
+        html: Raw HTML as bytes
+    
+    Returns:
+        Iterator over the stripped block contents, in document order
+    """
+    pos = 0
+    while True:
+        marker = html.find(b'ld+json', pos)
+        if marker < 0:
+            return
+        # The marker must sit inside a <script ...> opening tag; a '>' in
+        # between means it is text (e.g. a selector inside an inline script)
+        tag_start = html.rfind(b'<', 0, marker)
+        if (
+            tag_start < 0
+            or html.find(b'>', tag_start, marker) >= 0
+            or html[tag_start + 1:tag_start + 7].lower() != b'script'
+        ):
+            pos = marker + 7
+            continue
+        tag_end = html.find(b'>', marker)
+        if tag_end < 0:
+            return
+        pos = tag_end + 1
+        close = html.find(b'</', pos)
+        while close >= 0 and html[close + 2:close + 8].lower() != b'script':
+            close = html.find(b'</', close + 2)
+        if close < 0:
+            return
+        block = html[pos:close].strip()
+        pos = close
+        if block:
+            yield block
+
+
+def covers_schema(data: Dict[str, Any], schema: Dict[str, Any]) -> bool:
+    """Check whether data has every required (or, failing that, every) top-level schema field"""
+    fields = schema.get('required') or list(schema.get('properties', {}))
+    return bool(fields) and all(data.get(field) is not None for field in fields)
+
+
+def project_to_schema(data: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the top-level fields defined in the schema"""
+    properties = schema.get('properties', {})
+    return {key: value for key, value in data.items() if key in properties}
 
 
 class StructuredDataExtractor:
@@ -27,43 +122,87 @@ class StructuredDataExtractor:
         """
         Extract all available structured data.
         
+        The HTML is parsed once and the tree is shared by every source.
+        
         Returns:
             Combined structured data from all sources
         """
+        if not html or not html.strip():
+            return None
+        
+        has_jsonld = _JSONLD_PROBE.search(html) is not None
+        has_meta = _META_PROBE.search(html) is not None
+        has_data_attrs = _DATA_ATTR_PROBE.search(html) is not None
+        if not (has_jsonld or has_meta or has_data_attrs):
+            logger.debug("   No structured data markers in HTML")
+            return None
+        
+        try:
+            doc = lxml_html.document_fromstring(html.encode('utf-8'), parser=_PARSER)
+        except (etree.ParserError, ValueError) as e:
+            logger.warning(f"Structured data parse failed: {e}")
+            return None
+        
         data = {}
         
         # Try JSON-LD first (most reliable)
-        jsonld = self.extract_jsonld(html)
+        jsonld = self.extract_jsonld(doc) if has_jsonld else None
         if jsonld:
             data['jsonld'] = jsonld
         
         # Try meta tags
-        meta = self.extract_meta_tags(html)
+        meta = self.extract_meta_tags(doc) if has_meta else None
         if meta:
             data['meta'] = meta
         
         # Try data attributes
-        attrs = self.extract_data_attributes(html)
+        attrs = self.extract_data_attributes(doc) if has_data_attrs else None
         if attrs:
             data['attributes'] = attrs
         
         return data if data else None
     
-    def extract_jsonld(self, html: str) -> Optional[Dict[str, Any]]:
+    def extract_jsonld(self, doc: lxml_html.HtmlElement) -> Optional[Dict[str, Any]]:
         """
         Extract JSON-LD structured data.
         
         Common types: Product, Article, JobPosting, Review, Organization
         """
+        # Lazily walk JSON-LD blocks and stop at the first relevant one
+        blocks = (
+            script.text.strip() for script in doc.iter('script')
+            if (script.get('type') or '').strip().lower() == 'application/ld+json' and script.text
+        )
+        return self.first_relevant_jsonld(blocks)
+    
+    def first_relevant_jsonld(self, blocks: Iterable[Union[str, bytes]]) -> Optional[Dict[str, Any]]:
+        """
+        Parse JSON-LD blocks in order and return the first relevant object.
+        
+        Args:
+            blocks: Raw JSON-LD block contents (e.g. from iter_jsonld_blocks)
+        
+        Returns:
+            First object with a relevant @type, or None
+        """
         try:
-            pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
-            matches = re.findall(pattern, html, re.DOTALL | re.IGNORECASE)
-            
-            logger.debug(f"   Found {len(matches)} JSON-LD blocks")
+            # Pages often repeat the same block (e.g. Organization in head
+            # and body); skip exact repeats instead of re-parsing them
+            seen = set()
             
-            for i, match in enumerate(matches):
+            for i, block in enumerate(blocks):
+                if block in seen:
+                    continue
+                seen.add(block)
+                
+                # A block that never mentions a relevant type can't match
+                if len(block) > _JSONLD_PRESCAN_SIZE:
+                    pattern = _RELEVANT_SCHEMA_RE_BYTES if isinstance(block, bytes) else _RELEVANT_SCHEMA_RE
+                    if pattern.search(block) is None:
+                        continue
+                
                 try:
-                    data = json.loads(match.strip())
+                    data = json_loads(block)
                     
                     # Handle single object
                     if isinstance(data, dict):
@@ -85,35 +224,38 @@ class StructuredDataExtractor:
                     logger.debug(f"   ⚠️  Failed to parse JSON-LD block {i+1}")
                     continue
             
+            logger.debug("   No relevant JSON-LD found")
             return None
         
         except Exception as e:
             logger.warning(f"JSON-LD extraction failed: {e}")
             return None
     
-    def extract_meta_tags(self, html: str) -> Optional[Dict[str, str]]:
+    def extract_meta_tags(self, doc: lxml_html.HtmlElement) -> Optional[Dict[str, str]]:
         """Extract OpenGraph, Twitter Card, and standard meta tags"""
         try:
             meta_data = {}
             
-            # OpenGraph tags (og:title, og:description, og:image, etc.)
-            og_pattern = r'<meta[^>]*property=["\']og:([^"\']+)["\'][^>]*content=["\']([^"\']+)["\'][^>]*>'
-            og_matches = re.findall(og_pattern, html, re.IGNORECASE)
-            for prop, content in og_matches:
-                meta_data[f'og_{prop}'] = content
-            
-            # Twitter Card tags
-            tw_pattern = r'<meta[^>]*name=["\']twitter:([^"\']+)["\'][^>]*content=["\']([^"\']+)["\'][^>]*>'
-            tw_matches = re.findall(tw_pattern, html, re.IGNORECASE)
-            for prop, content in tw_matches:
-                meta_data[f'twitter_{prop}'] = content
-            
-            # Standard meta tags
-            meta_pattern = r'<meta[^>]*name=["\']([^"\']+)["\'][^>]*content=["\']([^"\']+)["\'][^>]*>'
-            meta_matches = re.findall(meta_pattern, html, re.IGNORECASE)
-            for name, content in meta_matches:
-                if name.lower() in ['description', 'keywords', 'author', 'price', 'availability']:
-                    meta_data[name.lower()] = content
+            # Single pass over <meta>, dispatching on property/name
+            for meta in doc.iter('meta'):
+                content = meta.get('content')
+                if not content:
+                    continue
+                
+                prop = meta.get('property') or ''
+                name = (meta.get('name') or '').lower()
+                
+                # OpenGraph tags (og:title, og:description, og:image, etc.)
+                if prop[:3].lower() == 'og:':
+                    meta_data[f'og_{prop[3:]}'] = content
+                
+                # Twitter Card tags
+                elif name.startswith('twitter:'):
+                    meta_data[f'twitter_{name[8:]}'] = content
+                
+                # Standard meta tags
+                elif name in _STANDARD_META_NAMES:
+                    meta_data[name] = content
             
             logger.debug(f"   Found {len(meta_data)} meta tags")
             return meta_data if meta_data else None
@@ -122,27 +264,19 @@ class StructuredDataExtractor:
             logger.warning(f"Meta tag extraction failed: {e}")
             return None
     
-    def extract_data_attributes(self, html: str) -> Optional[Dict[str, str]]:
+    def extract_data_attributes(self, doc: lxml_html.HtmlElement) -> Optional[Dict[str, str]]:
         """Extract data-* attributes (common in e-commerce)"""
         try:
             data_attrs = {}
             
-            patterns = [
-                (r'data-product-([^=]+)=["\']([^"\']+)["\']', 'product_'),
-                (r'data-price=["\']([^"\']+)["\']', 'price'),
-                (r'data-name=["\']([^"\']+)["\']', 'name'),
-                (r'data-id=["\']([^"\']+)["\']', 'id'),
-                (r'data-sku=["\']([^"\']+)["\']', 'sku'),
-            ]
-            
-            for pattern, prefix in patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        key, value = match
-                        data_attrs[f'{prefix}{key}'] = value
-                    else:
-                        data_attrs[prefix] = match
+            for element in _DATA_ATTR_XPATH(doc):
+                for attr, value in element.attrib.items():
+                    if not value:
+                        continue
+                    if attr.startswith('data-product-'):
+                        data_attrs[f'product_{attr[13:]}'] = value
+                    elif attr in _DATA_ATTR_KEYS:
+                        data_attrs[_DATA_ATTR_KEYS[attr]] = value
             
             logger.debug(f"   Found {len(data_attrs)} data attributes")
             return data_attrs if data_attrs else None
@@ -151,11 +285,12 @@ class StructuredDataExtractor:
             logger.warning(f"Data attribute extraction failed: {e}")
             return None
     
-    def _is_relevant_schema(self, schema_type: str) -> bool:
-        """Check if schema type is relevant for extraction"""
-        relevant_types = [
-            'Product', 'Article', 'NewsArticle', 'BlogPosting',
-            'JobPosting', 'Review', 'Organization', 'Person',
-            'Event', 'Recipe', 'Book', 'Movie'
-        ]
-        return any(t in schema_type for t in relevant_types)
+    def _is_relevant_schema(self, schema_type: Union[str, List[str]]) -> bool:
+        """Check if schema type (or any type in a list) is relevant for extraction"""
+        if isinstance(schema_type, list):
+            return any(self._is_relevant_schema(t) for t in schema_type if isinstance(t, str))
+        if not isinstance(schema_type, str):
+            return False
+        # Exact @type names are the common case; compound or prefixed types
+        # ("ProductGroup", "https://schema.org/Product") fall back to one scan
+        return schema_type in _RELEVANT_SCHEMAS or _RELEVANT_SCHEMA_RE.search(schema_type) is not None
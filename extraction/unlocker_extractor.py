@@ -4,13 +4,122 @@ Web Unlocker Extractor - HTTP-based extraction via Bright Data Web Unlocker API
 This extractor bypasses bot detection using Web Unlocker API instead of browser automation.
 Works in parallel with Playwright extraction for optimal speed/success ratio.
 """
+import asyncio
+import copy
 import json
+import random
+import re
 import httpx
-from typing import Dict, Any, Optional
-from anthropic import Anthropic
+from typing import Dict, Any, List, Optional, Tuple
+from anthropic import AsyncAnthropic
+from lxml import etree, html as lxml_html
 
 from config import settings
-from utils import logger
+from utils import logger, json_loads, to_json, TTLCache
+from extraction.structured_data_extractor import (
+    StructuredDataExtractor, iter_jsonld_blocks, covers_schema, project_to_schema
+)
+
+
+_PARSER = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True)
+
+MAX_TEXT_CHARS = 30000  # ~7,500 tokens sent to Claude
+MAX_OUTPUT_TOKENS = 4096
+# Pessimistic chars-per-token for the context preflight (dense or non-English
+# text can tokenize at ~2 chars/token, well below the usual ~4)
+MIN_CHARS_PER_TOKEN = 2
+# Raw HTML bytes kept per character of text budget; markup typically outweighs
+# visible text by ~4x once scripts/styles are removed
+HTML_CHARS_PER_TEXT_CHAR = 4
+
+# Markdown code fence around a JSON payload (```json ... ``` or ``` ... ```)
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+# Byte patterns: the page stays UTF-8 bytes from the response to the parser.
+# Only opening tags are matched by regex; block ends are found with
+# bytes.find, so malformed pages can't trigger backtracking.
+_BODY_START_RE = re.compile(rb'<body\b', re.IGNORECASE)
+_NON_TEXT_OPEN_RE = re.compile(rb'<(script|style|noscript)\b')
+
+
+def _strip_non_text_blocks(html: bytes) -> bytes:
+    """
+    Replace <script>, <style> and <noscript> blocks with a space.
+
+    Linear scan: each block end is located with bytes.find on a lowercased
+    copy. An unclosed block runs to the end, as it would in a browser.
+    """
+    lower = html.lower()
+    parts = []
+    pos = 0
+    while True:
+        match = _NON_TEXT_OPEN_RE.search(lower, pos)
+        if not match:
+            break
+        parts.append(html[pos:match.start()])
+        parts.append(b' ')
+        close = lower.find(b'</' + match.group(1), match.end())
+        if close < 0:
+            return b''.join(parts)
+        end = lower.find(b'>', close)
+        if end < 0:
+            return b''.join(parts)
+        pos = end + 1
+    parts.append(html[pos:])
+    return b''.join(parts)
+
+# Transient Web Unlocker failures worth a quick retry before giving up
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+MAX_FETCH_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5  # Seconds; decorrelated jitter grows up to 3x the previous delay
+RETRY_MAX_DELAY = 4.0
+
+# Fixed tail of the extraction prompt, appended after the page text
+_PROMPT_SUFFIX = """
+
+Instructions:
+1. Extract ONLY the fields specified in the schema
+2. Return valid JSON matching the exact schema structure
+3. If a field is missing, omit it or use null
+4. Do not add extra fields or modify the schema
+
+Return ONLY the JSON, no explanations."""
+
+# Shared connection-pooled client: keep-alive connections to the Web Unlocker
+# endpoint are reused across extractions instead of a new TLS handshake per URL
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared Web Unlocker HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.UNLOCKER_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            headers={
+                "Authorization": f"Bearer {settings.UNLOCKER_API_TOKEN}",
+                "Content-Type": "application/json"
+            }
+        )
+    return _http_client
+
+
+async def aclose_http_client():
+    """Close the shared Web Unlocker HTTP client (call on shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Recent extractions keyed by (url, query/schema hash), plus in-flight tasks so
+# concurrent requests for the same key share one fetch and LLM call
+_result_cache = TTLCache(maxsize=256, ttl=settings.UNLOCKER_CACHE_TTL)
+_in_flight: Dict[Tuple[str, int], "asyncio.Task"] = {}
+# Callers currently awaiting each in-flight task; the work is only cancelled
+# once every one of them has gone away
+_waiters: Dict["asyncio.Task", int] = {}
 
 
 class WebUnlockerExtractor:
@@ -26,7 +135,7 @@ class WebUnlockerExtractor:
 
     def __init__(
         self,
-        anthropic_client: Anthropic,
+        anthropic_client: AsyncAnthropic,
         json_schema: Dict[str, Any],
         query: str
     ):
@@ -35,6 +144,23 @@ class WebUnlockerExtractor:
         self.query = query
         self.model = settings.CLAUDE_MODEL
 
+        # Query and schema are fixed per instance, so the prompt scaffold is
+        # serialized once; only the page text is appended per call
+        self._schema_str = to_json(json_schema, indent=True)
+        self._prompt_prefix = (
+            "Extract data from this webpage based on the user's query.\n\n"
+            f"User Query: {query}\n\n"
+            f"Target JSON Schema:\n{self._schema_str}\n\n"
+            "Webpage Content:\n"
+        )
+        self._cache_token = hash(self._prompt_prefix)
+
+        # Token preflight: a large schema eats into the context window, so cap
+        # page text so prompt + output always fit rather than risk a 400
+        prompt_tokens = (len(self._prompt_prefix) + len(_PROMPT_SUFFIX)) // MIN_CHARS_PER_TOKEN
+        available_tokens = settings.CLAUDE_CONTEXT_WINDOW - prompt_tokens - MAX_OUTPUT_TOKENS - 100
+        self._max_text_chars = max(0, min(MAX_TEXT_CHARS, available_tokens * MIN_CHARS_PER_TOKEN))
+
         # Web Unlocker config
         self.api_token = settings.UNLOCKER_API_TOKEN
         self.zone = settings.UNLOCKER_ZONE
@@ -55,6 +181,41 @@ class WebUnlockerExtractor:
             logger.warning("Web Unlocker not configured - API token or zone missing")
             return None
 
+        key = (url, self._cache_token)
+        cached = _result_cache.get(key)
+        if cached is not None:
+            logger.info("♻️  Web Unlocker cache hit")
+            return copy.deepcopy(cached)
+
+        # Coalesce concurrent requests for the same URL and schema
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._extract_uncached(url))
+            _in_flight[key] = task
+            task.add_done_callback(lambda done: _in_flight.pop(key, None) if _in_flight.get(key) is done else None)
+        _waiters[task] = _waiters.get(task, 0) + 1
+
+        try:
+            # Shielded: one caller being cancelled (e.g. its race was won by
+            # Playwright) must not cancel the work other callers still await
+            extracted = await asyncio.shield(task)
+        finally:
+            _waiters[task] -= 1
+            if not _waiters[task]:
+                del _waiters[task]
+                if not task.done():
+                    # Last caller gone before the result: nobody needs it
+                    task.cancel()
+                    if _in_flight.get(key) is task:
+                        del _in_flight[key]
+
+        if extracted:
+            _result_cache.set(key, extracted)
+            return copy.deepcopy(extracted)
+        return extracted
+
+    async def _extract_uncached(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch via Web Unlocker and extract with the LLM (no caching)"""
         try:
             logger.info("🔓 Starting Web Unlocker extraction...")
 
@@ -66,6 +227,13 @@ class WebUnlockerExtractor:
 
             logger.info(f"   ✅ Received HTML: {len(html)} bytes")
 
+            # Step 1b: Use JSON-LD directly when it already covers the schema
+            if settings.PREFER_JSONLD:
+                jsonld = self._extract_jsonld(html)
+                if jsonld and covers_schema(jsonld, self.json_schema):
+                    logger.info("   🎉 JSON-LD matched schema directly (no LLM call)")
+                    return project_to_schema(jsonld, self.json_schema)
+
             # Step 2: Extract data using Claude (same as LLM strategy)
             extracted = await self._extract_with_llm(html)
 
@@ -78,22 +246,43 @@ class WebUnlockerExtractor:
             logger.error(f"   ❌ Web Unlocker extraction failed: {e}")
             return None
 
-    async def _fetch_via_unlocker(self, url: str) -> Optional[str]:
+    async def extract_many(self, urls: List[str], concurrency: int = 8) -> List[Optional[Dict[str, Any]]]:
+        """
+        Extract data from several URLs concurrently.
+
+        Fetches and LLM calls are I/O-bound, so running them side by side
+        turns N x latency into roughly the slowest single extraction.
+
+        Args:
+            urls: Target URLs to scrape
+            concurrency: Maximum extractions in flight at once
+
+        Returns:
+            Extracted data (or None) for each URL, in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _one(url: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.extract(url)
+
+        results = await asyncio.gather(*(_one(url) for url in urls), return_exceptions=True)
+        return [None if isinstance(result, BaseException) else result for result in results]
+
+    async def _fetch_via_unlocker(self, url: str) -> Optional[bytes]:
         """
         Fetch HTML via Web Unlocker API.
 
+        Rate limits, gateway errors and dropped connections are retried with
+        exponential backoff and jitter; other errors fail immediately.
+
         Args:
             url: Target URL
 
         Returns:
-            Raw HTML content
+            Raw HTML content as UTF-8 bytes
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_token}",
-                "Content-Type": "application/json"
-            }
-
             payload = {
                 "zone": self.zone,
                 "url": url,
@@ -104,17 +293,36 @@ class WebUnlockerExtractor:
             logger.debug(f"   Zone: {self.zone}")
             logger.debug(f"   URL: {url}")
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.endpoint,
-                    headers=headers,
-                    json=payload
-                )
-
-                response.raise_for_status()
-
-                # Web Unlocker returns HTML directly in response body
-                return response.text
+            delay = RETRY_BASE_DELAY
+            for attempt in range(1, MAX_FETCH_ATTEMPTS + 1):
+                try:
+                    response = await _get_http_client().post(
+                        self.endpoint,
+                        json=payload
+                    )
+                    response.raise_for_status()
+                    break
+                except (httpx.HTTPStatusError, httpx.ConnectError, httpx.RemoteProtocolError) as e:
+                    if isinstance(e, httpx.HTTPStatusError):
+                        reason = f"HTTP {e.response.status_code}"
+                        transient = e.response.status_code in RETRY_STATUS_CODES
+                    else:
+                        reason = type(e).__name__
+                        transient = True
+                    if not transient or attempt == MAX_FETCH_ATTEMPTS:
+                        raise
+                    # Decorrelated jitter: spreads concurrent retries apart
+                    # instead of having them hit the endpoint in lockstep
+                    delay = random.uniform(RETRY_BASE_DELAY, min(RETRY_MAX_DELAY, delay * 3))
+                    logger.warning(f"   ⚠️  Web Unlocker attempt {attempt} failed ({reason}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+            # Web Unlocker returns HTML directly in response body; keep the
+            # bytes as-is unless the server declared a non-UTF-8 charset
+            encoding = (response.charset_encoding or 'utf-8').lower()
+            if encoding in ('utf-8', 'utf8'):
+                return response.content
+            return response.text.encode('utf-8')
 
         except httpx.TimeoutException:
             logger.error(f"   ❌ Web Unlocker timeout ({self.timeout}s)")
@@ -129,60 +337,77 @@ class WebUnlockerExtractor:
             logger.error(f"   ❌ Web Unlocker request failed: {e}")
             return None
 
-    async def _extract_with_llm(self, html: str) -> Optional[Dict[str, Any]]:
+    def _extract_jsonld(self, html: bytes) -> Optional[Dict[str, Any]]:
+        """Return the page's relevant JSON-LD object, if it has one"""
+        # Byte scan for the script blocks only; no full-document parse
+        return StructuredDataExtractor().first_relevant_jsonld(iter_jsonld_blocks(html))
+
+    async def _extract_with_llm(self, html: bytes) -> Optional[Dict[str, Any]]:
         """
         Extract structured data from HTML using Claude.
 
         Args:
-            html: Raw HTML content
+            html: Raw HTML content as UTF-8 bytes
 
         Returns:
             Extracted data matching schema
         """
         try:
-            # Clean HTML for token optimization
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
+            if not self._max_text_chars:
+                logger.error("   ❌ Schema leaves no room for page content in the context window")
+                return None
 
-            # Remove script and style tags
-            for tag in soup(['script', 'style', 'noscript']):
-                tag.decompose()
+            # Bound the parse: text is capped at the text budget anyway, so a
+            # multi-MB page only needs its leading body markup. Skip <head>,
+            # drop inline scripts/styles from a window, then cut to budget.
+            html_budget = HTML_CHARS_PER_TEXT_CHAR * self._max_text_chars
+            if len(html) > html_budget:
+                body = _BODY_START_RE.search(html)
+                start = body.start() if body else 0
+                window = html[start:start + 2 * html_budget]
+                html = _strip_non_text_blocks(window)[:html_budget]
+
+            # Clean HTML for token optimization (C parser, comments dropped)
+            doc = lxml_html.document_fromstring(html, parser=_PARSER)
 
-            # Get clean text
-            clean_text = soup.get_text(separator=' ', strip=True)
+            # Remove script and style tags
+            etree.strip_elements(doc, 'script', 'style', 'noscript', with_tail=False)
+
+            # Get clean text: whitespace collapsed per text node, skipping
+            # blank nodes and stopping once the text budget is filled
+            parts = []
+            size = 0
+            for text in doc.itertext():
+                words = text.split()
+                if words:
+                    part = ' '.join(words)
+                    parts.append(part)
+                    size += len(part) + 1
+                    if size > self._max_text_chars:
+                        break
+            clean_text = ' '.join(parts)
 
             # Limit to prevent token overflow
-            max_chars = 30000  # ~7,500 tokens
-            if len(clean_text) > max_chars:
-                clean_text = clean_text[:max_chars]
+            if len(clean_text) > self._max_text_chars:
+                clean_text = clean_text[:self._max_text_chars]
 
             logger.debug(f"   🤖 Calling Claude for extraction...")
             logger.debug(f"   Text size: {len(clean_text)} chars (~{len(clean_text)//4} tokens)")
 
-            prompt = f"""Extract data from this webpage based on the user's query.
-
-User Query: {self.query}
-
-Target JSON Schema:
-{json.dumps(self.json_schema, indent=2)}
-
-Webpage Content:
-{clean_text}
-
-Instructions:
-1. Extract ONLY the fields specified in the schema
-2. Return valid JSON matching the exact schema structure
-3. If a field is missing, omit it or use null
-4. Do not add extra fields or modify the schema
-
-Return ONLY the JSON, no explanations."""
+            # Query + schema prefix is identical for every page this
+            # instance extracts; mark it cacheable so repeat calls read it
+            # from Anthropic's prompt cache instead of re-processing it
+            content = [
+                {"type": "text", "text": self._prompt_prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": clean_text + _PROMPT_SUFFIX}
+            ]
 
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
-                max_tokens=4096,
+                max_tokens=MAX_OUTPUT_TOKENS,
                 temperature=0.0,
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": content}
                 ]
             )
 
@@ -202,12 +427,11 @@ Return ONLY the JSON, no explanations."""
         """Parse JSON from LLM response, handling markdown code blocks."""
         try:
             # Remove markdown code blocks if present
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
+            match = _FENCE_RE.search(text)
+            if match:
+                text = match.group(1)
 
-            return json.loads(text)
+            return json_loads(text)
 
         except json.JSONDecodeError as e:
             logger.error(f"   ❌ JSON parsing failed: {e}")
@@ -9,8 +9,14 @@ Core extraction logic using Scrapy with Playwright integration.
 Includes intelligent wait strategies, token optimization, and multi-source extraction.
 """
 import asyncio
+import functools
+import hashlib
+import random
+import re
 import threading
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
 
 # Install asyncio reactor FIRST, before anything else imports reactor
 import sys
@@ -20,21 +26,24 @@ if 'twisted.internet.reactor' not in sys.modules:
 
 from scrapy.crawler import CrawlerRunner
 from twisted.internet import reactor, defer
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+import httpx
 
 # Import Scrapy components
-from scrapers.universal_spider import UniversalSpider
-from scrapers.scrapy_settings import get_settings_dict
+from scrapers.universal_spider import UniversalSpider, UniversalBatchSpider
+from scrapers.scrapy_settings import get_settings_dict, USER_AGENT_LIST
 
 # Import extraction layers
 from extraction.llm_extractor import ScrapyLLMExtractor
 from extraction.content_optimizer import ContentOptimizer
-from extraction.structured_data_extractor import StructuredDataExtractor
+from extraction.structured_data_extractor import (
+    StructuredDataExtractor, iter_jsonld_blocks, covers_schema, project_to_schema
+)
 
 from config import settings
 from models import ExtractionResult, ExtractionError
 from strategy_router import StrategyType
-from utils import logger, sanitize_url
+from utils import logger, sanitize_url, json_dumps, TTLCache
 
 
 # Global flag to track if reactor is running
@@ -42,6 +51,106 @@ _reactor_running = False
 _reactor_thread = None
 _reactor_lock = threading.Lock()
 
+@functools.lru_cache(maxsize=1)
+def _scrapy_settings() -> Dict[str, Any]:
+    """Scrapy settings, built once per process (they only depend on env config)"""
+    return get_settings_dict()
+
+
+# Shared Anthropic clients, so every extraction reuses warm keep-alive
+# connections. Each is only used from one event loop: the caller's (Web
+# Unlocker) and the reactor thread's (spider)
+_anthropic_client: Optional[AsyncAnthropic] = None
+_spider_anthropic_client: Optional[AsyncAnthropic] = None
+
+# One CrawlerRunner for every crawl in this process; settings are parsed once
+# and the runner only ever schedules crawls on the reactor thread
+_runner: Optional[CrawlerRunner] = None
+
+# Recent successful extractions, keyed by (url, normalized query, schema hash)
+_result_cache = TTLCache(maxsize=500, ttl=settings.EXTRACTION_CACHE_TTL)
+
+
+def _result_cache_key(url: str, query: str, json_schema: Dict[str, Any], pydantic_code: str) -> tuple:
+    """Build the extraction cache key; queries differing only in case/spacing share an entry"""
+    schema_hash = hashlib.blake2b(
+        json_dumps(json_schema, sort_keys=True) + pydantic_code.encode(), digest_size=16
+    ).hexdigest()
+    return (url, ' '.join(query.lower().split()), schema_hash)
+
+
+# Plain-HTTP client for the JSON-LD fast path; created lazily so it binds to
+# the event loop extract() runs on, and reused for keep-alive connections
+_fetch_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_fetch_client() -> httpx.AsyncClient:
+    global _fetch_client
+    if _fetch_client is None:
+        _fetch_client = httpx.AsyncClient(
+            timeout=settings.HTTP_FALLBACK_TIMEOUT,
+            follow_redirects=True,
+            headers={'User-Agent': random.choice(USER_AGENT_LIST)},
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    return _fetch_client
+
+
+# Per-domain circuit breakers:
+# domain -> (consecutive throttled failures, opened_at, trial_started_at)
+_breakers: Dict[str, Tuple[int, float, float]] = {}
+_THROTTLE_RE = re.compile(r'\b(?:429|503)\b')
+
+
+def _breaker_allows(domain: str) -> bool:
+    """
+    Check whether a request to domain may go ahead.
+    
+    A tripped domain is refused until the cooldown passes; then exactly one
+    caller is let through as the half-open trial and the rest keep being
+    refused until its outcome is recorded. A trial that never reports back
+    (e.g. a cancelled race) expires after another cooldown.
+    """
+    threshold = settings.CIRCUIT_BREAKER_THRESHOLD
+    failures, opened_at, trial_started_at = _breakers.get(domain, (0, 0.0, 0.0))
+    if threshold <= 0 or failures < threshold:
+        return True
+    
+    now = time.monotonic()
+    cooldown = settings.CIRCUIT_BREAKER_COOLDOWN
+    if now - opened_at < cooldown or now - trial_started_at < cooldown:
+        return False
+    
+    _breakers[domain] = (failures, opened_at, now)
+    logger.info(f"🔌 Circuit half-open for {domain}, sending one trial request")
+    return True
+
+
+def _record_outcome(domain: str, result: ExtractionResult):
+    """
+    Update a domain's breaker from an extraction result.
+    
+    Success resets it; a 429/503 failure counts towards tripping it (and
+    re-trips it when the half-open trial fails). Any other failure just
+    ends a pending trial so the next caller can try again.
+    """
+    if result.success:
+        _breakers.pop(domain, None)
+    elif result.error_message and _THROTTLE_RE.search(result.error_message):
+        failures = _breakers.get(domain, (0, 0.0, 0.0))[0] + 1
+        _breakers[domain] = (failures, time.monotonic(), 0.0)
+        if failures == settings.CIRCUIT_BREAKER_THRESHOLD:
+            logger.warning(f"🔌 Circuit open for {domain} after {failures} throttled failures")
+    else:
+        _end_trial(domain)
+
+
+def _end_trial(domain: str):
+    """Release a domain's half-open trial slot without changing its failure count"""
+    if domain in _breakers:
+        failures, opened_at, _ = _breakers[domain]
+        _breakers[domain] = (failures, opened_at, 0.0)
+
 
 class WebExtractor:
     """
@@ -65,10 +174,22 @@ class WebExtractor:
         self.use_undetected = use_undetected
 
         # Get Scrapy settings
-        self.settings = get_settings_dict()
+        global _runner
+        self.settings = _scrapy_settings()
+        if _runner is None:
+            _runner = CrawlerRunner(self.settings)
+        self.runner = _runner
         
-        # Initialize Anthropic client for LLM extraction
-        self.anthropic_client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        # Async client for Web Unlocker extraction, awaited on the caller's loop
+        global _anthropic_client, _spider_anthropic_client
+        if _anthropic_client is None:
+            _anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.anthropic_client = _anthropic_client
+        # Async client for the spider's extractor; only ever used from the
+        # reactor thread's event loop, so its connection pool stays on one loop
+        if _spider_anthropic_client is None:
+            _spider_anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.async_anthropic_client = _spider_anthropic_client
         
         # Start reactor in background thread if not already running
         self._ensure_reactor_running()
@@ -83,14 +204,16 @@ class WebExtractor:
         
         with _reactor_lock:
             if not _reactor_running and not reactor.running:
+                started = threading.Event()
+                
                 def run_reactor():
                     global _reactor_running
                     _reactor_running = True
                     try:
                         # Create a new event loop for the reactor thread
-                        import asyncio
                         loop = asyncio.new_event_loop()
                         asyncio.set_event_loop(loop)
+                        reactor.callWhenRunning(started.set)
                         reactor.run(installSignalHandlers=False)
                     finally:
                         _reactor_running = False
@@ -102,14 +225,8 @@ class WebExtractor:
                 _reactor_thread = threading.Thread(target=run_reactor, daemon=True)
                 _reactor_thread.start()
                 
-                # Wait for reactor to start
-                import time
-                for _ in range(50):  # Wait up to 0.5 seconds
-                    if reactor.running:
-                        break
-                    time.sleep(0.01)
-                
-                if reactor.running:
+                # Signalled by the reactor itself once it is running
+                if started.wait(timeout=5.0):
                     logger.debug("Started Twisted reactor in background thread")
                 else:
                     logger.warning("Reactor may not have started properly")
@@ -124,7 +241,8 @@ class WebExtractor:
         timeout: int = 30000,
         use_smart_wait: bool = True,
         js_code: Optional[str] = None,
-        pydantic_code: str = ""
+        pydantic_code: str = "",
+        http_fallback: bool = True
     ) -> ExtractionResult:
         """
         Extract data using Scrapy + Playwright.
@@ -139,6 +257,8 @@ class WebExtractor:
             use_smart_wait: Use domain-specific waits (always True)
             js_code: Optional JS code (not yet implemented)
             pydantic_code: Pydantic model code for validation
+            http_fallback: Try JSON-LD over plain HTTP when the render comes
+                back empty (off when a caller already runs that fetch itself)
 
         Returns:
             ExtractionResult
@@ -150,9 +270,19 @@ class WebExtractor:
         # Get schema from strategy
         json_schema = getattr(strategy, 'schema', {})
         
+        cache_key = _result_cache_key(url, query, json_schema, pydantic_code)
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("♻️  Returning cached extraction result")
+            return cached.model_copy(deep=True)
+        
+        domain = urlparse(url).netloc
+        if not _breaker_allows(domain):
+            raise ExtractionError(f"Circuit open for {domain} (recent 429/503 responses)")
+        
         # Create extraction layer instances
         llm_extractor = ScrapyLLMExtractor(
-            anthropic_client=self.anthropic_client,
+            anthropic_client=self.async_anthropic_client,
             json_schema=json_schema,
             query=query
         )
@@ -161,7 +291,7 @@ class WebExtractor:
         
         # Run Scrapy spider
         try:
-            results = self._run_spider(
+            results = await self._run_spider(
                                     url=url,
                                     query=query,
                 json_schema=json_schema,
@@ -177,7 +307,8 @@ class WebExtractor:
             
             result = results[0]
             
-            return ExtractionResult(
+            # Fields come from our own spider; skip re-validation
+            extraction = ExtractionResult.model_construct(
                 url=result['url'],
                 query=result['query'],
                 extracted_data=result['extracted_data'],
@@ -185,14 +316,62 @@ class WebExtractor:
                 success=result['success'],
                 error_message=result.get('error_message')
             )
+            _record_outcome(domain, extraction)
+            
+            # Empty render: server-side HTML often still carries the JSON-LD,
+            # and one GET is far cheaper than another browser attempt
+            if (
+                not (extraction.success and extraction.extracted_data)
+                and http_fallback and settings.HTTP_FALLBACK_ENABLED
+            ):
+                data = await self._fetch_jsonld(url, json_schema)
+                if data:
+                    extraction = ExtractionResult.model_construct(
+                        url=url,
+                        query=query,
+                        extracted_data=data,
+                        extraction_strategy=f"{strategy_type.value}_http_jsonld",
+                        success=True,
+                        error_message=None
+                    )
+            
+            if extraction.success and extraction.extracted_data:
+                _result_cache.set(cache_key, extraction.model_copy(deep=True))
+            
+            return extraction
         
         except Exception as e:
+            _end_trial(domain)
             logger.error(f"Scrapy extraction failed: {e}")
             import traceback
             logger.error(traceback.format_exc())
             raise ExtractionError(str(e))
     
-    def _run_spider(
+    async def _fetch_jsonld(self, url: str, json_schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Re-fetch a page over plain HTTP and map its JSON-LD onto the schema.
+        
+        Args:
+            url: Target URL
+            json_schema: Target JSON schema
+        
+        Returns:
+            Schema fields from the page's JSON-LD, or None if it doesn't cover the schema
+        """
+        try:
+            response = await _get_fetch_client().get(url)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.debug(f"   HTTP fallback fetch failed: {type(e).__name__}")
+            return None
+        
+        jsonld = StructuredDataExtractor().first_relevant_jsonld(iter_jsonld_blocks(response.content))
+        if jsonld and covers_schema(jsonld, json_schema):
+            logger.info("⚡ JSON-LD from plain HTTP fetch matched schema (no browser retry)")
+            return project_to_schema(jsonld, json_schema)
+        return None
+    
+    async def _run_spider(
         self,
         url: str,
         query: str,
@@ -201,63 +380,172 @@ class WebExtractor:
         strategy_type: str,
         llm_extractor: ScrapyLLMExtractor,
         content_optimizer: ContentOptimizer,
-        structured_extractor: StructuredDataExtractor
+        structured_extractor: StructuredDataExtractor,
+        urls: Optional[List[str]] = None,
+        timeout: float = 120
     ) -> list:
         """
-        Run Scrapy spider and wait for results.
+        Run Scrapy spider and await its results.
         
-        Uses reactor.callFromThread to run spider in Twisted thread.
+        The crawl is scheduled on the reactor thread with callFromThread and
+        its Deferred resolves an asyncio Future on the caller's loop, so the
+        caller's event loop keeps running (e.g. the Web Unlocker racer)
+        while the spider works. When urls is given, all of them are crawled
+        by one batch spider (one browser) and one result per URL is returned.
         """
-        runner = CrawlerRunner(self.settings)
         results = []
-        completed = threading.Event()
-        error_holder = [None]
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        
+        def resolve(error=None):
+            # Runs on the caller's loop; the future may already be cancelled
+            # by the timeout below
+            if done.done():
+                return
+            if error is None:
+                done.set_result(results)
+            else:
+                done.set_exception(error)
         
         def run_crawler():
             """Run crawler in reactor thread"""
             try:
-                d = runner.crawl(
-                    UniversalSpider,
-                        url=url,
-                        query=query,
+                d = self.runner.crawl(
+                    UniversalBatchSpider if urls else UniversalSpider,
+                    url=url,
+                    query=query,
                     json_schema=json_schema,
                     pydantic_code=pydantic_code,
                     strategy_type=strategy_type,
                     llm_extractor=llm_extractor,
                     content_optimizer=content_optimizer,
                     structured_extractor=structured_extractor,
-                    results_collector=results
+                    results_collector=results,
+                    urls=urls
                 )
                 
                 def on_complete(_):
-                    completed.set()
+                    loop.call_soon_threadsafe(resolve)
                 
                 def on_error(failure):
-                    error_holder[0] = failure
-                    completed.set()
+                    error = ExtractionError(f"Spider failed: {failure.getErrorMessage()}")
+                    loop.call_soon_threadsafe(resolve, error)
                 
-                d.addCallback(on_complete)
-                d.addErrback(on_error)
+                d.addCallbacks(on_complete, on_error)
                 
             except Exception as e:
-                error_holder[0] = e
-                completed.set()
+                loop.call_soon_threadsafe(resolve, ExtractionError(f"Spider failed: {e}"))
         
         # Schedule crawler in reactor thread
         reactor.callFromThread(run_crawler)
         
-        # Wait for completion (timeout: 120 seconds)
-        if not completed.wait(timeout=120):
-            raise ExtractionError("Spider execution timeout (120s)")
-        
-        # Check for errors
-        if error_holder[0]:
-            if hasattr(error_holder[0], 'getErrorMessage'):
-                raise ExtractionError(f"Spider failed: {error_holder[0].getErrorMessage()}")
-            else:
-                raise ExtractionError(f"Spider failed: {error_holder[0]}")
+        try:
+            return await asyncio.wait_for(done, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ExtractionError(f"Spider execution timeout ({timeout:.0f}s)")
 
-        return results
+    async def extract_many(
+        self,
+        urls: List[str],
+        query: str,
+        strategy_type: Any,
+        strategy: Any,
+        pydantic_code: str = ""
+    ) -> List[ExtractionResult]:
+        """
+        Extract the same query from several URLs in a single crawl.
+        
+        All pages share one Playwright browser (one cold start instead of
+        one per URL) and up to SCRAPE_CONCURRENCY render concurrently.
+        Cached results are returned without crawling.
+        
+        Args:
+            urls: Target URLs
+            query: Extraction query
+            strategy_type: StrategyType enum
+            strategy: Strategy instance (contains json_schema)
+            pydantic_code: Pydantic model code for validation
+        
+        Returns:
+            One ExtractionResult per URL, in input order
+        """
+        urls = [sanitize_url(url) for url in urls]
+        json_schema = getattr(strategy, 'schema', {})
+        
+        results: Dict[str, ExtractionResult] = {}
+        for url in urls:
+            cached = _result_cache.get(_result_cache_key(url, query, json_schema, pydantic_code))
+            if cached is not None:
+                results[url] = cached.model_copy(deep=True)
+        
+        for url in urls:
+            if url not in results and not _breaker_allows(urlparse(url).netloc):
+                results[url] = ExtractionResult.model_construct(
+                    url=url,
+                    query=query,
+                    extracted_data={},
+                    extraction_strategy=f"{strategy_type.value}_error",
+                    success=False,
+                    error_message=f"Circuit open for {urlparse(url).netloc} (recent 429/503 responses)"
+                )
+        
+        pending = [url for url in dict.fromkeys(urls) if url not in results]
+        if pending:
+            logger.info(f"🕷️  Starting Scrapy batch extraction: {len(pending)} URLs")
+            batches = -(-len(pending) // max(1, settings.SCRAPE_CONCURRENCY))
+            try:
+                raw_results = await self._run_spider(
+                    url=pending[0],
+                    query=query,
+                    json_schema=json_schema,
+                    pydantic_code=pydantic_code,
+                    strategy_type=str(strategy_type.value),
+                    llm_extractor=ScrapyLLMExtractor(
+                        anthropic_client=self.async_anthropic_client,
+                        json_schema=json_schema,
+                        query=query
+                    ),
+                    content_optimizer=ContentOptimizer(),
+                    structured_extractor=StructuredDataExtractor(),
+                    urls=pending,
+                    timeout=120 * batches
+                )
+            except ExtractionError as e:
+                logger.error(f"Scrapy batch extraction failed: {e}")
+                raw_results = []
+            
+            for result in raw_results:
+                extraction = ExtractionResult.model_construct(
+                    url=result['url'],
+                    query=result['query'],
+                    extracted_data=result['extracted_data'],
+                    extraction_strategy=result['extraction_strategy'],
+                    success=result['success'],
+                    error_message=result.get('error_message')
+                )
+                results[result['source_url']] = extraction
+                _record_outcome(urlparse(result['source_url']).netloc, extraction)
+                if extraction.success and extraction.extracted_data:
+                    _result_cache.set(
+                        _result_cache_key(result['source_url'], query, json_schema, pydantic_code),
+                        extraction.model_copy(deep=True)
+                    )
+            
+            for url in pending:
+                if url not in results:
+                    _end_trial(urlparse(url).netloc)
+        
+        return [
+            results.get(url) or ExtractionResult.model_construct(
+                url=url,
+                query=query,
+                extracted_data={},
+                extraction_strategy=f"{strategy_type.value}_error",
+                success=False,
+                error_message="No result from batch crawl"
+            )
+            for url in urls
+        ]
 
     async def extract_with_fallback(
         self,
@@ -335,12 +623,14 @@ class WebExtractor:
         """
         Extract data using PARALLEL RACE strategy.
 
-        Runs both Playwright+Proxies and Web Unlocker simultaneously,
-        returns whichever succeeds first, cancels the slower one.
+        Runs Playwright+Proxies, Web Unlocker and a plain HTTP JSON-LD
+        fetch simultaneously, returns whichever succeeds first, cancels
+        the slower ones.
 
         This provides:
         - Speed: Fast path wins when possible (~30s)
         - Success: Unlocker wins when site is protected (~40-80s)
+        - Static pages: plain HTTP wins when server-rendered JSON-LD covers the schema (<1s)
         - Automatic: No manual selection needed
 
         Args:
@@ -353,9 +643,10 @@ class WebExtractor:
         Returns:
             ExtractionResult from whichever method succeeds first
         """
-        print(f"\n🔧 DEBUG: extract_with_race called!")
-        print(f"   UNLOCKER_ENABLED: {settings.UNLOCKER_ENABLED}")
-        print(f"   UNLOCKER_API_TOKEN: {settings.UNLOCKER_API_TOKEN is not None}")
+        logger.debug(
+            "extract_with_race: UNLOCKER_ENABLED=%s, UNLOCKER_API_TOKEN set=%s",
+            settings.UNLOCKER_ENABLED, settings.UNLOCKER_API_TOKEN is not None
+        )
 
         if not settings.UNLOCKER_ENABLED or not settings.UNLOCKER_API_TOKEN:
             # Web Unlocker not configured, fall back to regular extraction
@@ -368,11 +659,7 @@ class WebExtractor:
                 pydantic_code=pydantic_code
             )
 
-        print("\n" + "="*70)
-        print("🏁 STARTING PARALLEL RACE EXTRACTION")
-        print(f"   Playwright+Proxies vs Web Unlocker")
-        print("="*70)
-        logger.info("🏁 Starting PARALLEL RACE: Playwright+Proxies vs Web Unlocker")
+        logger.info("🏁 Starting PARALLEL RACE: Playwright+Proxies vs Web Unlocker vs HTTP")
 
         # Import Web Unlocker extractor
         from extraction.unlocker_extractor import WebUnlockerExtractor
@@ -389,37 +676,34 @@ class WebExtractor:
         async def playwright_path():
             """Playwright + Proxies extraction"""
             try:
-                print("   🎭 Path 1: Playwright+Proxies started")
                 logger.info("   🎭 Path 1: Playwright+Proxies started")
+                # Path 3 already covers the plain HTTP JSON-LD fetch
                 result = await self.extract(
                     url=url,
                     query=query,
                     strategy_type=strategy_type,
                     strategy=strategy,
-                    pydantic_code=pydantic_code
+                    pydantic_code=pydantic_code,
+                    http_fallback=False
                 )
                 if result.success and result.extracted_data:
-                    print("   ✅ Path 1: Playwright+Proxies SUCCEEDED")
                     logger.info("   ✅ Path 1: Playwright+Proxies SUCCEEDED")
                     return ("playwright", result)
                 else:
-                    print("   ⚠️  Path 1: Playwright+Proxies returned empty data")
                     logger.warning("   ⚠️  Path 1: Playwright+Proxies returned empty data")
                     return ("playwright", None)
             except Exception as e:
-                print(f"   ❌ Path 1: Playwright+Proxies failed: {e}")
                 logger.error(f"   ❌ Path 1: Playwright+Proxies failed: {e}")
                 return ("playwright", None)
 
         async def unlocker_path():
             """Web Unlocker HTTP extraction"""
             try:
-                print("   🔓 Path 2: Web Unlocker started")
                 logger.info("   🔓 Path 2: Web Unlocker started")
                 extracted_data = await unlocker.extract(url)
                 if extracted_data:
                     logger.info("   ✅ Path 2: Web Unlocker SUCCEEDED")
-                    result = ExtractionResult(
+                    result = ExtractionResult.model_construct(
                         url=url,
                         query=query,
                         extracted_data=extracted_data,
@@ -434,57 +718,135 @@ class WebExtractor:
                 logger.error(f"   ❌ Path 2: Web Unlocker failed: {e}")
                 return ("unlocker", None)
 
-        # Race both paths
+        async def http_path():
+            """Plain HTTP fetch, JSON-LD only (no browser, no LLM)"""
+            if not settings.HTTP_FALLBACK_ENABLED:
+                return ("http", None)
+            try:
+                logger.info("   ⚡ Path 3: Plain HTTP started")
+                extracted_data = await self._fetch_jsonld(sanitize_url(url), json_schema)
+                if extracted_data:
+                    logger.info("   ✅ Path 3: Plain HTTP SUCCEEDED")
+                    result = ExtractionResult.model_construct(
+                        url=url,
+                        query=query,
+                        extracted_data=extracted_data,
+                        extraction_strategy=f"{strategy_type.value}_http_jsonld",
+                        success=True
+                    )
+                    return ("http", result)
+                logger.info("   ⚠️  Path 3: Plain HTTP found no matching JSON-LD")
+                return ("http", None)
+            except Exception as e:
+                logger.error(f"   ❌ Path 3: Plain HTTP failed: {e}")
+                return ("http", None)
+
+        # Race all paths
         playwright_task = asyncio.create_task(playwright_path())
         unlocker_task = asyncio.create_task(unlocker_path())
+        http_task = asyncio.create_task(http_path())
+
+        tasks = [playwright_task, unlocker_task, http_task]
 
         try:
-            # Wait for first to complete
-            done, pending = await asyncio.wait(
-                {playwright_task, unlocker_task},
-                return_when=asyncio.FIRST_COMPLETED
+            # Take results in finishing order; a path that finishes empty
+            # leaves the others running instead of ending the race
+            for finished in asyncio.as_completed(tasks):
+                name, result = await finished
+                if result and result.success:
+                    logger.info(f"🏆 RACE WINNER: {name.upper()} (other tasks cancelled)")
+                    return result
+                logger.warning(f"⚠️  {name.upper()} finished without data, waiting for other tasks...")
+
+            # All failed
+            raise ExtractionError("Playwright, Web Unlocker and plain HTTP extraction all failed")
+
+        finally:
+            # Stop the slower paths (or all of them if the race itself was
+            # cancelled) and let them unwind before returning
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def extract_many_with_race(
+        self,
+        urls: List[str],
+        query: str,
+        strategy_type: StrategyType,
+        strategy: Any,
+        pydantic_code: str = "",
+        max_concurrency: Optional[int] = None
+    ) -> List[ExtractionResult]:
+        """
+        Race Playwright against Web Unlocker for several URLs at once.
+        
+        Up to max_concurrency races run concurrently. Without Web Unlocker
+        there is nothing to race, so all URLs go through one shared-browser
+        crawl (extract_many) instead.
+        
+        Args:
+            urls: Target URLs
+            query: Extraction query
+            strategy_type: Strategy type (LLM)
+            strategy: Strategy instance
+            pydantic_code: Pydantic validation code
+            max_concurrency: Concurrent races (defaults to SCRAPE_CONCURRENCY)
+        
+        Returns:
+            One ExtractionResult per URL, in input order
+        """
+        if not settings.UNLOCKER_ENABLED or not settings.UNLOCKER_API_TOKEN:
+            return await self.extract_many(
+                urls=urls,
+                query=query,
+                strategy_type=strategy_type,
+                strategy=strategy,
+                pydantic_code=pydantic_code
             )
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.SCRAPE_CONCURRENCY))
+        
+        async def race_one(url: str) -> ExtractionResult:
+            async with semaphore:
+                return await self.extract_with_race(
+                    url=url,
+                    query=query,
+                    strategy_type=strategy_type,
+                    strategy=strategy,
+                    pydantic_code=pydantic_code
+                )
+        
+        outcomes = await asyncio.gather(*(race_one(url) for url in urls), return_exceptions=True)
+        
+        results = []
+        for url, outcome in zip(urls, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, Exception):
+                outcome = ExtractionResult.model_construct(
+                    url=url,
+                    query=query,
+                    extracted_data={},
+                    extraction_strategy=f"{strategy_type.value}_error",
+                    success=False,
+                    error_message=str(outcome)
+                )
+            results.append(outcome)
+        return results
 
-            # Get the winner
-            winner_task = done.pop()
-            winner_name, winner_result = await winner_task
 
-            # Check if winner succeeded
-            if winner_result and winner_result.success:
-                print(f"\n🏆 RACE WINNER: {winner_name.upper()} (other task cancelled)\n")
-                logger.info(f"🏆 RACE WINNER: {winner_name.upper()} (other task cancelled)")
+# Shared by extract_from_url so repeated calls reuse one reactor, runner and
+# set of HTTP pools
+_default_extractor: Optional[WebExtractor] = None
 
-                # Cancel the slower task since we don't need it
-                for task in pending:
-                    task.cancel()
-                    try:
-                        await task
-                    except asyncio.CancelledError:
-                        pass
-
-                return winner_result
-
-            # Winner failed, wait for the other task (don't cancel it!)
-            print(f"   ⚠️  {winner_name.upper()} completed first but failed, waiting for other task...")
-            logger.warning(f"⚠️  {winner_name.upper()} completed first but failed, waiting for other task...")
-
-            # Wait for the other task to complete
-            loser_task = pending.pop() if pending else None
-            if loser_task:
-                loser_name, loser_result = await loser_task
-                if loser_result and loser_result.success:
-                    print(f"   ✅ {loser_name.upper()} succeeded!\n")
-                    logger.info(f"✅ Second method ({loser_name.upper()}) succeeded")
-                    return loser_result
-
-            # Both failed
-            raise ExtractionError("Both Playwright and Web Unlocker extraction failed")
-
-        except asyncio.CancelledError:
-            # Clean up tasks if race is cancelled
-            playwright_task.cancel()
-            unlocker_task.cancel()
-            raise
+
+def _get_extractor() -> WebExtractor:
+    """Return the shared WebExtractor, creating it on first use"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = WebExtractor()
+    return _default_extractor
 
 
 # Convenience function (kept for backward compatibility)
@@ -508,7 +870,7 @@ async def extract_from_url(
     Returns:
         Extracted data dictionary
     """
-    extractor = WebExtractor()
+    extractor = _get_extractor()
     result = await extractor.extract(
         url=url,
         query=query,
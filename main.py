@@ -17,7 +17,7 @@ from pydantic import BaseModel, ValidationError as PydanticValidationError
 
 from config import settings
 from schema_generator import SchemaGenerator
-from strategy_router import StrategyRouter, StrategyType
+from strategy_router import StrategyType, choose_strategy
 from extractor import WebExtractor
 from models import ExtractionError, SchemaGenerationError, StrategyRoutingError
 from utils import logger, sanitize_url
@@ -163,8 +163,10 @@ async def scrape(
     logger.info("🔀 Determining extraction strategy...")
     start = time.time()
 
-    strategy_router = StrategyRouter()
-    strategy_type, strategy = strategy_router.choose_strategy(
+    # Routing makes a blocking Claude call on the shared router's client;
+    # run it in a thread so the event loop stays free
+    strategy_type, strategy = await asyncio.to_thread(
+        choose_strategy,
         url=url,
         query=query,
         json_schema=schema_result.json_schema,
@@ -7,7 +7,7 @@ Uses only Bright Data Web Unlocker HTTP API.
 """
 import asyncio
 from typing import Dict, Any, Optional
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from config import settings
 from extraction.unlocker_extractor import WebUnlockerExtractor
@@ -38,7 +38,7 @@ async def production_scrape(
 
         # Step 2: Extract using Web Unlocker
         logger.info("🔓 Extracting via Web Unlocker...")
-        client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
         extractor = WebUnlockerExtractor(
             anthropic_client=client,
             json_schema=schema_result.json_schema,
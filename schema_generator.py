@@ -5,15 +5,30 @@ Generates Pydantic schemas dynamically from natural language queries using Claud
 """
 import re
 import json
-from typing import Tuple, Type, Any
+from typing import Optional, Tuple, Type, Any
 from pydantic import BaseModel
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from config import settings
 from models import SchemaGenerationResult, SchemaGenerationError
 from utils import logger
 
 
+# Markdown code blocks around generated model code
+_PYTHON_BLOCK_RE = re.compile(r'```python\n(.*?)```', re.DOTALL)
+_PLAIN_BLOCK_RE = re.compile(r'```\n(.*?)```', re.DOTALL)
+
+# Shared client so every SchemaGenerator reuses one HTTP connection pool
+_anthropic_client: Optional[AsyncAnthropic] = None
+
+
+def _get_anthropic() -> AsyncAnthropic:
+    """Return the shared AsyncAnthropic client, creating it on first use"""
+    global _anthropic_client
+    if _anthropic_client is None:
+        _anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+    return _anthropic_client
+
 SCHEMA_GENERATION_PROMPT = """You are a Pydantic schema generation expert. Your task is to generate a valid Pydantic v2 model based on the user's natural language extraction query.
 
 **IMPORTANT RULES:**
@@ -99,7 +114,7 @@ class SchemaGenerator:
         Args:
             api_key: Anthropic API key (defaults to settings.ANTHROPIC_API_KEY)
         """
-        self.client = Anthropic(api_key=api_key or settings.ANTHROPIC_API_KEY)
+        self.client = AsyncAnthropic(api_key=api_key) if api_key else _get_anthropic()
         self.model = settings.CLAUDE_MODEL
 
     async def generate_schema(self, query: str) -> SchemaGenerationResult:
@@ -119,7 +134,7 @@ class SchemaGenerator:
             logger.info(f"Generating schema for query: {query[:100]}...")
 
             # Call Claude to generate schema
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=settings.CLAUDE_MAX_TOKENS,
                 temperature=settings.CLAUDE_TEMPERATURE,
@@ -143,7 +158,8 @@ class SchemaGenerator:
 
             logger.info(f"Successfully generated schema: {model_name}")
 
-            return SchemaGenerationResult(
+            # Values were produced (and the model compiled) above; skip re-validation
+            return SchemaGenerationResult.model_construct(
                 query=query,
                 pydantic_code=pydantic_code,
                 json_schema=json_schema,
@@ -168,12 +184,12 @@ class SchemaGenerator:
             SchemaGenerationError: If code cannot be extracted
         """
         # Try to extract code from markdown blocks
-        code_block_match = re.search(r'```python\n(.*?)```', raw_response, re.DOTALL)
+        code_block_match = _PYTHON_BLOCK_RE.search(raw_response)
         if code_block_match:
             return code_block_match.group(1).strip()
 
         # Try without language specifier
-        code_block_match = re.search(r'```\n(.*?)```', raw_response, re.DOTALL)
+        code_block_match = _PLAIN_BLOCK_RE.search(raw_response)
         if code_block_match:
             return code_block_match.group(1).strip()
 
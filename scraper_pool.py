@@ -0,0 +1,161 @@
+"""
+Scraper Worker Pool
+
+Keeps a small pool of long-lived scraper_subprocess.py workers so each scrape
+reuses an already-imported interpreter (Scrapy, Playwright, Twisted reactor)
+instead of paying process start-up and import cost on every request.
+
+Workers speak length-prefixed frames over stdin/stdout: a 4-byte big-endian
+length followed by that many bytes of JSON, one job frame in and one result
+frame out. Payloads never go through argv, so job size is not capped by
+ARG_MAX, and results of any size are read without line-length limits.
+"""
+import asyncio
+import os
+import struct
+import sys
+from typing import Dict, Any, Optional
+
+from config import settings
+from utils import logger, json_dumps, json_loads
+
+
+SCRAPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper_subprocess.py")
+FRAME_HEADER = struct.Struct("!I")
+
+
+class ScraperWorker:
+    """A single long-lived scraper subprocess"""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+    @classmethod
+    async def spawn(cls) -> "ScraperWorker":
+        """Start a worker subprocess in --worker mode"""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            SCRAPER_SCRIPT,
+            "--worker",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        logger.debug(f"🔧 Started scraper worker (pid {process.pid})")
+        return cls(process)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def _drain_stderr(self):
+        """Forward worker stderr to the debug log so the pipe never fills up"""
+        async for line in self.process.stderr:
+            logger.debug(f"Worker {self.process.pid} stderr: {line.decode('utf-8', errors='replace').rstrip()}")
+
+    async def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one job to the worker and wait for its result.
+
+        Args:
+            job: Scraper input (url, query, options)
+
+        Returns:
+            Parsed result dictionary from the worker
+
+        Raises:
+            RuntimeError: If the worker exits before replying
+        """
+        body = json_dumps(job)
+        self.process.stdin.write(FRAME_HEADER.pack(len(body)) + body)
+        await self.process.stdin.drain()
+
+        try:
+            header = await self.process.stdout.readexactly(FRAME_HEADER.size)
+            (length,) = FRAME_HEADER.unpack(header)
+            payload = await self.process.stdout.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise RuntimeError(f"Scraper worker exited unexpectedly (code {await self.process.wait()})")
+        return json_loads(payload)
+
+    async def close(self):
+        """Terminate the worker process"""
+        if self.alive:
+            self.process.kill()
+            await self.process.wait()
+        self._stderr_task.cancel()
+
+
+class ScraperPool:
+    """
+    Pool of long-lived scraper workers.
+
+    At most ``size`` jobs run at once. Idle workers wait in an asyncio.Queue
+    and are spawned lazily; a worker that times out or dies is discarded and
+    a fresh one is spawned for the next job.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure_started(self):
+        # Created lazily so they bind to the running event loop
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.size)
+
+    async def start(self):
+        """Pre-spawn all workers (e.g. at server startup)"""
+        self._ensure_started()
+        while self._idle.qsize() < self.size:
+            self._idle.put_nowait(await ScraperWorker.spawn())
+
+    async def _acquire(self) -> ScraperWorker:
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker.alive:
+                return worker
+            await worker.close()
+        return await ScraperWorker.spawn()
+
+    async def run(self, job: Dict[str, Any], timeout: float = 120.0) -> Dict[str, Any]:
+        """
+        Run a scrape job on an idle worker.
+
+        Args:
+            job: Scraper input (url, query, options)
+            timeout: Seconds to wait for the result before killing the worker
+
+        Returns:
+            Result dictionary with success, data, and error fields
+
+        Raises:
+            asyncio.TimeoutError: If the job exceeds the timeout
+            RuntimeError: If the worker dies mid-job
+        """
+        self._ensure_started()
+        async with self._slots:
+            worker = await self._acquire()
+            try:
+                result = await asyncio.wait_for(worker.run(job), timeout=timeout)
+            except BaseException:
+                # A worker in an unknown state can't be reused: a late reply
+                # would be read as the answer to the next job
+                await worker.close()
+                raise
+
+            self._idle.put_nowait(worker)
+            return result
+
+    async def close(self):
+        """Terminate all idle workers"""
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+
+
+scraper_pool = ScraperPool(settings.SCRAPER_WORKERS)
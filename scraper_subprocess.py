@@ -7,6 +7,7 @@ avoiding event loop conflicts with the agent mode.
 
 Usage:
     python scraper_subprocess.py '{"url": "...", "query": "...", "options": {...}}'
+    python scraper_subprocess.py --worker   # Long-lived mode, length-prefixed JSON frames on stdin/stdout
 
 Input (JSON):
     {
@@ -35,6 +36,8 @@ from typing import Dict, Any
 # Import scraper components
 from main import scrape
 from models import ExtractionError, SchemaGenerationError, StrategyRoutingError
+from scraper_pool import FRAME_HEADER
+from utils import json_dumps, json_loads, to_json, install_uvloop
 
 
 async def run_scraper(input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -93,8 +96,56 @@ async def run_scraper(input_data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+def worker_loop():
+    """
+    Long-lived worker mode used by scraper_pool.
+
+    Reads length-prefixed JSON job frames from stdin and writes one result
+    frame per job to stdout, reusing this interpreter (and its imports and
+    Twisted reactor) across jobs.
+    """
+    stdin = sys.stdin.buffer
+    out = sys.stdout.buffer
+    # Keep stray prints from the scraper off the result channel
+    sys.stdout = sys.stderr
+
+    # The Twisted reactor already captured its own stock asyncio loop when
+    # extractor was imported; only the job loop (extract, races, Web
+    # Unlocker and Claude calls) runs on uvloop
+    install_uvloop()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    print("🔧 Scraper worker started", file=sys.stderr, flush=True)
+
+    while True:
+        header = stdin.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            break  # Parent closed the pipe
+        (length,) = FRAME_HEADER.unpack(header)
+        payload = stdin.read(length)
+
+        try:
+            input_data = json_loads(payload)
+            print(f"🔧 Job received: {input_data.get('url')}", file=sys.stderr, flush=True)
+            result = loop.run_until_complete(run_scraper(input_data))
+        except json.JSONDecodeError as e:
+            result = {
+                "success": False,
+                "data": None,
+                "error": f"Invalid JSON input: {str(e)}"
+            }
+
+        body = json_dumps(result)
+        out.write(FRAME_HEADER.pack(len(body)) + body)
+        out.flush()
+
+
 def main():
     """Main entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker_loop()
+        return
+
     try:
         # Debug logging to stderr
         print("🔧 Scraper subprocess started", file=sys.stderr, flush=True)
@@ -108,16 +159,17 @@ def main():
             input_json = sys.stdin.read()
 
         # Parse input
-        input_data = json.loads(input_json)
+        input_data = json_loads(input_json)
         print(f"🔧 Parsed input: {input_data.get('url')}", file=sys.stderr, flush=True)
 
         # Run scraper
         print("🔧 Starting scraper...", file=sys.stderr, flush=True)
+        install_uvloop()
         result = asyncio.run(run_scraper(input_data))
         print(f"🔧 Scraper completed: success={result.get('success')}", file=sys.stderr, flush=True)
 
         # Output result as JSON
-        print(json.dumps(result, ensure_ascii=False))
+        print(to_json(result))
 
         # Exit with appropriate code
         sys.exit(0 if result["success"] else 1)
@@ -128,7 +180,7 @@ def main():
             "data": None,
             "error": f"Invalid JSON input: {str(e)}"
         }
-        print(json.dumps(error_result, ensure_ascii=False))
+        print(to_json(error_result))
         sys.exit(1)
 
     except Exception as e:
@@ -138,7 +190,7 @@ def main():
             "error": f"Fatal error: {str(e)}",
             "traceback": traceback.format_exc()
         }
-        print(json.dumps(error_result, ensure_ascii=False))
+        print(to_json(error_result))
         sys.exit(1)
 
 
@@ -130,6 +130,12 @@ def get_settings_dict():
         'TELNETCONSOLE_ENABLED': TELNETCONSOLE_ENABLED,
     }
     
+    # A warm external browser skips the per-crawl launch; launch options
+    # don't apply to it
+    if app_settings.BROWSER_CDP_URL:
+        settings_dict['PLAYWRIGHT_CDP_URL'] = app_settings.BROWSER_CDP_URL
+        del settings_dict['PLAYWRIGHT_LAUNCH_OPTIONS']
+    
     # Add proxy configuration if enabled
     if app_settings.PROXY_ENABLED and app_settings.BRIGHTDATA_USERNAME and app_settings.BRIGHTDATA_PASSWORD:
         settings_dict['PLAYWRIGHT_CONTEXTS'] = {
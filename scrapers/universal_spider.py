@@ -2,8 +2,10 @@
 Universal Scrapy Spider with Playwright Support
 Handles any URL + query with dynamic schema
 """
+import asyncio
 import scrapy
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from scrapy_playwright.page import PageMethod
 from urllib.parse import urlparse
@@ -13,6 +15,23 @@ from scrapers.wait_strategies import get_playwright_methods
 from utils import logger
 
 
+# HTML parsing (structured data, content optimization) is CPU-bound; run it
+# off the reactor's event loop so other crawls keep making progress. One
+# worker, because the extractors share module-level lxml parsers, which
+# must not be used from two threads at once.
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="html-parse")
+
+
+async def _run_parse(func, *args):
+    """Run a CPU-bound parsing function on the parse thread"""
+    return await asyncio.get_running_loop().run_in_executor(_PARSE_EXECUTOR, func, *args)
+
+
+def _has_data(data: Dict[str, Any]) -> bool:
+    """Check if any value is set (not None, [] or {}), stopping at the first"""
+    return any(v is not None and v != [] and v != {} for v in data.values())
+
+
 class UniversalSpider(scrapy.Spider):
     """
     Universal spider that works with any URL and dynamic schema.
@@ -61,6 +80,7 @@ class UniversalSpider(scrapy.Spider):
         content_optimizer: Any = None,
         structured_extractor: Any = None,
         results_collector: Optional[List] = None,
+        urls: Optional[List[str]] = None,
         *args,
         **kwargs
     ):
@@ -77,9 +97,10 @@ class UniversalSpider(scrapy.Spider):
             content_optimizer: Content optimizer instance  
             structured_extractor: Structured data extractor instance
             results_collector: List to collect results (for async integration)
+            urls: Several target URLs to scrape in this one crawl (overrides url)
         """
         super().__init__(*args, **kwargs)
-        self.start_urls = [url]
+        self.start_urls = list(urls) if urls else [url]
         self.query = query
         self.json_schema = json_schema
         self.pydantic_code = pydantic_code
@@ -111,9 +132,12 @@ class UniversalSpider(scrapy.Spider):
                 callback=self.parse,
                 errback=self.errback,
                 dont_filter=True,
+                # No playwright_include_page: parse only needs the HTML, and
+                # letting the handler close the tab frees the context's page
+                # slot for Scrapy's retries instead of leaving it held open
                 meta={
+                    'source_url': url,
                     'playwright': True,
-                    'playwright_include_page': True,
                     'playwright_page_methods': playwright_methods,
                     'playwright_page_goto_kwargs': {
                         'wait_until': 'load',  # or 'networkidle' for JS-heavy
@@ -130,6 +154,7 @@ class UniversalSpider(scrapy.Spider):
         Phase 2 will add: Structured data → Optimized content → Full extraction
         """
         url = response.url
+        source_url = response.meta.get('source_url', url)
         html = response.text
         
         logger.info(f"📄 Parsing {url}")
@@ -140,10 +165,18 @@ class UniversalSpider(scrapy.Spider):
             # Try structured data extraction if available
             if self.structured_extractor:
                 logger.info("🔍 Checking structured data sources...")
-                structured_data = self.structured_extractor.extract_all(html)
+                structured_data = await _run_parse(self.structured_extractor.extract_all, html)
                 
                 if structured_data:
                     logger.info(f"✅ Found structured data: {list(structured_data.keys())}")
+                    
+                    # JSON-LD that already covers the schema needs no LLM call
+                    coerced = self._coerce_structured_data(structured_data)
+                    if coerced:
+                        logger.info("🎉 JSON-LD matched schema directly (no LLM call)")
+                        yield self._format_result(coerced, url, "structured_data", source_url=source_url)
+                        return
+                    
                     # Convert with LLM (minimal tokens)
                     if self.llm_extractor:
                         extracted = await self.llm_extractor.convert_structured_data(
@@ -152,19 +185,19 @@ class UniversalSpider(scrapy.Spider):
                         )
                         if extracted and not self._is_empty(extracted):
                             logger.info("🎉 Structured data extraction successful!")
-                            yield self._format_result(extracted, url, "structured_data")
+                            yield self._format_result(extracted, url, "structured_data", source_url=source_url)
                             return
             
             # Try optimized extraction if available
             if self.content_optimizer and self.llm_extractor:
                 logger.info("🔍 Optimized LLM extraction...")
-                optimized_content = self.content_optimizer.optimize(html, self.query)
+                optimized_content = await _run_parse(self.content_optimizer.optimize, html, self.query)
                 logger.info(f"   Token reduction: {len(html)} → {len(optimized_content)} bytes")
                 
                 extracted = await self.llm_extractor.extract(optimized_content)
                 if extracted and not self._is_empty(extracted):
                     logger.info("✅ Optimized LLM extraction successful!")
-                    yield self._format_result(extracted, url, "llm_optimized")
+                    yield self._format_result(extracted, url, "llm_optimized", source_url=source_url)
                     return
             
             # Fallback: Basic extraction with full HTML
@@ -174,12 +207,12 @@ class UniversalSpider(scrapy.Spider):
                 
                 if extracted and not self._is_empty(extracted):
                     logger.info("✅ Full LLM extraction successful!")
-                    yield self._format_result(extracted, url, "llm_full")
+                    yield self._format_result(extracted, url, "llm_full", source_url=source_url)
                     return
             
             # All strategies failed
             logger.error("❌ All extraction strategies failed")
-            yield self._format_result({}, url, "failed", success=False)
+            yield self._format_result({}, url, "failed", success=False, source_url=source_url)
             
         except Exception as e:
             logger.error(f"❌ Extraction error: {e}")
@@ -188,7 +221,8 @@ class UniversalSpider(scrapy.Spider):
                 url, 
                 "error", 
                 success=False,
-                error_message=str(e)
+                error_message=str(e),
+                source_url=source_url
             )
     
     def errback(self, failure):
@@ -196,12 +230,20 @@ class UniversalSpider(scrapy.Spider):
         logger.error(f"❌ Request failed: {failure.request.url}")
         logger.error(f"   Error: {failure.value}")
         
+        # Keep the status code in the message so callers can spot rate limits
+        response = getattr(failure.value, 'response', None)
+        if response is not None:
+            error_message = f"HTTP {response.status}: {failure.value}"
+        else:
+            error_message = str(failure.value)
+        
         yield self._format_result(
             {},
             failure.request.url,
             "error",
             success=False,
-            error_message=str(failure.value)
+            error_message=error_message,
+            source_url=failure.request.meta.get('source_url')
         )
     
     def _format_result(
@@ -210,11 +252,13 @@ class UniversalSpider(scrapy.Spider):
         url: str, 
         extraction_method: str,
         success: bool = True,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        source_url: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Format extraction result"""
+        """Format extraction result (source_url is the requested URL, before redirects)"""
         result = {
             'url': url,
+            'source_url': source_url or url,
             'query': self.query,
             'extracted_data': data,
             'extraction_strategy': f"{self.strategy_type}_{extraction_method}",
@@ -229,16 +273,46 @@ class UniversalSpider(scrapy.Spider):
     
     def _is_empty(self, data: Dict[str, Any]) -> bool:
         """Check if extracted data is empty"""
-        if not data:
-            return True
+        return not data or not _has_data(data)
+    
+    def _coerce_structured_data(self, structured_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Map JSON-LD straight onto the schema when its keys cover every field.
         
-        # Check if all values are empty lists, None, or empty dicts
-        return all(
-            (isinstance(v, list) and len(v) == 0) or 
-            v is None or 
-            v == {}
-            for v in data.values()
-        )
+        Handles the model itself and the common container shape (a model with
+        a single list-of-items field, where the JSON-LD object is one item).
+        
+        Returns:
+            Validated data, or None if the JSON-LD doesn't fully cover the schema
+        """
+        from pydantic import BaseModel
+        from typing import get_args
+        
+        jsonld = structured_data.get('jsonld')
+        model = self.pydantic_model
+        if not isinstance(jsonld, dict) or model is None:
+            return None
+        
+        try:
+            fields = model.model_fields
+            if fields and set(fields) <= jsonld.keys():
+                return model.model_validate(jsonld).model_dump()
+            
+            if len(fields) == 1:
+                field_name, field = next(iter(fields.items()))
+                # Unwrap List[Item] and Optional[List[Item]]
+                args = list(get_args(field.annotation))
+                args += [inner for arg in args for inner in get_args(arg)]
+                item_models = [
+                    arg for arg in args
+                    if isinstance(arg, type) and issubclass(arg, BaseModel)
+                ]
+                if item_models and item_models[0].model_fields and set(item_models[0].model_fields) <= jsonld.keys():
+                    return model.model_validate({field_name: [jsonld]}).model_dump()
+        except Exception as e:
+            logger.debug(f"   JSON-LD doesn't validate against schema: {e}")
+        
+        return None
     
     def _compile_pydantic_model(self, pydantic_code: str):
         """Compile Pydantic model from code string"""
@@ -266,3 +340,20 @@ class UniversalSpider(scrapy.Spider):
         except Exception as e:
             logger.warning(f"Failed to compile Pydantic model: {e}")
             return None
+
+
+class UniversalBatchSpider(UniversalSpider):
+    """
+    UniversalSpider for several URLs in one crawl.
+    
+    Every page is rendered by the same Playwright browser, with up to
+    SCRAPE_CONCURRENCY pages in flight instead of one at a time.
+    """
+    
+    name = 'universal_batch'
+    
+    custom_settings = {
+        **UniversalSpider.custom_settings,
+        'CONCURRENT_REQUESTS': settings.SCRAPE_CONCURRENCY,
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': settings.SCRAPE_CONCURRENCY,
+    }
@@ -4,6 +4,7 @@ Smart Wait Strategies for Different Website Types
 Flexible, adaptive wait strategies that work on any site without hardcoded selectors.
 Uses timeouts and network idle detection instead of fragile CSS selectors.
 """
+import re
 from typing import List, Optional
 from scrapy_playwright.page import PageMethod
 
@@ -24,6 +25,47 @@ SOCIAL_MEDIA_DOMAINS = [
     'twitter.com', 'x.com', 'facebook.com', 'instagram.com', 'linkedin.com'
 ]
 
+# One alternation per category, checked in priority order: a single scan
+# per category however long the domain lists grow
+_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(re.escape(d) for d in domains)))
+    for category, domains in (
+        ('ecommerce', E_COMMERCE_DOMAINS),
+        ('news', NEWS_CONTENT_DOMAINS),
+        ('social', SOCIAL_MEDIA_DOMAINS),
+    )
+]
+
+# Resolves once no resource has finished loading for SETTLE_QUIET_MS, or
+# after maxWait ms at the latest. Replaces fixed post-load sleeps: fast pages
+# return as soon as they are quiet, slow ones wait no longer than before.
+# Resource timing entries are recorded on completion, and a PerformanceObserver
+# sees every one of them (the global entry buffer stops at 250 by default).
+SETTLE_QUIET_MS = 300
+SETTLE_JS = """
+    async (maxWait) => {
+        const quiet = %d;
+        const deadline = performance.now() + maxWait;
+        let lastFinished = performance.now();
+        const observer = new PerformanceObserver(() => { lastFinished = performance.now(); });
+        observer.observe({type: 'resource'});
+        try {
+            while (true) {
+                const now = performance.now();
+                if (now >= deadline || now - lastFinished >= quiet) return;
+                await new Promise(r => setTimeout(r, Math.min(quiet - (now - lastFinished), deadline - now)));
+            }
+        } finally {
+            observer.disconnect();
+        }
+    }
+""" % SETTLE_QUIET_MS
+
+
+def wait_for_settle(max_wait_ms: int) -> PageMethod:
+    """Page method that waits for network quiet, capped at max_wait_ms"""
+    return PageMethod('evaluate', SETTLE_JS, max_wait_ms)
+
 
 def get_domain_category(domain: str) -> str:
     """Categorize domain to determine wait strategy"""
@@ -32,14 +74,10 @@ def get_domain_category(domain: str) -> str:
         domain_lower = domain_lower[4:]
     
     # Check categories
-    if any(d in domain_lower for d in E_COMMERCE_DOMAINS):
-        return 'ecommerce'
-    elif any(d in domain_lower for d in NEWS_CONTENT_DOMAINS):
-        return 'news'
-    elif any(d in domain_lower for d in SOCIAL_MEDIA_DOMAINS):
-        return 'social'
-    else:
-        return 'general'
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(domain_lower):
+            return category
+    return 'general'
 
 
 def get_playwright_methods(domain: str, query: str) -> List[PageMethod]:
@@ -65,9 +103,9 @@ def get_playwright_methods(domain: str, query: str) -> List[PageMethod]:
         methods.append(
             PageMethod('wait_for_load_state', 'networkidle', timeout=10000)
         )
-        # Additional buffer for lazy-loaded content
+        # Let lazy-loaded content settle (up to 2s)
         methods.append(
-            PageMethod('wait_for_timeout', 2000)
+            wait_for_settle(2000)
         )
         
     elif category == 'news':
@@ -76,7 +114,7 @@ def get_playwright_methods(domain: str, query: str) -> List[PageMethod]:
             PageMethod('wait_for_load_state', 'domcontentloaded', timeout=5000)
         )
         methods.append(
-            PageMethod('wait_for_timeout', 1000)
+            wait_for_settle(1000)
         )
         
     elif category == 'social':
@@ -85,7 +123,7 @@ def get_playwright_methods(domain: str, query: str) -> List[PageMethod]:
             PageMethod('wait_for_load_state', 'networkidle', timeout=15000)
         )
         methods.append(
-            PageMethod('wait_for_timeout', 3000)
+            wait_for_settle(3000)
         )
         
     else:
@@ -94,7 +132,7 @@ def get_playwright_methods(domain: str, query: str) -> List[PageMethod]:
             PageMethod('wait_for_load_state', 'domcontentloaded', timeout=8000)
         )
         methods.append(
-            PageMethod('wait_for_timeout', 1500)
+            wait_for_settle(1500)
         )
     
     # Scroll to trigger lazy loading if query suggests multiple items
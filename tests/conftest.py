@@ -0,0 +1,9 @@
+"""
+Shared pytest setup
+
+config.Settings requires ANTHROPIC_API_KEY at import time; unit tests never
+call the API, so a placeholder is enough.
+"""
+import os
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
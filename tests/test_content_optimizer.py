@@ -0,0 +1,40 @@
+"""
+Tests for the lxml-to-markdown content optimizer
+"""
+from extraction.content_optimizer import ContentOptimizer
+
+
+def optimize(body: str) -> str:
+    return ContentOptimizer().optimize(f"<html><body>{body}</body></html>", "query")
+
+
+def test_strips_chrome_and_keeps_main_content():
+    html = "<nav>Menu</nav><main><h1>Tee</h1><p>Soft cotton</p><script>track()</script></main><footer>Legal</footer>"
+    assert optimize(html) == "# Tee\n\nSoft cotton"
+
+
+def test_headings_links_and_images():
+    html = '<h2>Specs</h2><p>See the <a href="/size">size  guide</a></p><img src="/tee.png" alt="Tee">'
+    assert optimize(html) == "## Specs\n\nSee the [size guide](/size)\n\n![Tee](/tee.png)"
+
+
+def test_lists_and_table_rows():
+    html = (
+        "<ul><li>Red</li><li>Blue</li></ul>"
+        "<ol><li>Wash</li><li>Dry</li></ol>"
+        "<table><tr><th>Size</th><th>Price</th></tr><tr><td>M</td><td>$20</td></tr></table>"
+    )
+    assert optimize(html) == "- Red\n- Blue\n\n1. Wash\n2. Dry\n\n| Size | Price |\n| M | $20 |"
+
+
+def test_inline_text_and_line_breaks():
+    assert optimize("<div>Price: <span>$20</span><br>In stock</div>") == "Price: $20\nIn stock"
+
+
+def test_empty_input():
+    assert ContentOptimizer().optimize("", "query") == ""
+
+
+def test_input_without_elements():
+    assert ContentOptimizer().optimize("<!-- nothing rendered -->", "query") == ""
+    assert ContentOptimizer().optimize("   <!-- a --> <!-- b -->  ", "query") == ""
@@ -0,0 +1,100 @@
+"""
+Tests for WebExtractor helpers that don't need a browser
+"""
+import pytest
+
+import extractor
+from extractor import _breaker_allows, _record_outcome, _end_trial, _result_cache_key
+from models import ExtractionResult
+
+
+THROTTLED = ExtractionResult.model_construct(success=False, error_message="HTTP 429: Ignoring non-200 response")
+NOT_FOUND = ExtractionResult.model_construct(success=False, error_message="HTTP 404: Ignoring non-200 response")
+SUCCESS = ExtractionResult.model_construct(success=True, error_message=None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fresh breakers, threshold 2, cooldown 60s and a controllable monotonic clock"""
+    now = [1000.0]
+    monkeypatch.setattr(extractor, "_breakers", {})
+    monkeypatch.setattr(extractor, "settings", extractor.settings.model_copy(
+        update={"CIRCUIT_BREAKER_THRESHOLD": 2, "CIRCUIT_BREAKER_COOLDOWN": 60}
+    ))
+    monkeypatch.setattr(extractor.time, "monotonic", lambda: now[0])
+    return now
+
+
+def trip(domain):
+    _record_outcome(domain, THROTTLED)
+    _record_outcome(domain, THROTTLED)
+
+
+def test_trips_after_threshold_throttled_failures(clock):
+    _record_outcome("a.com", THROTTLED)
+    assert _breaker_allows("a.com")
+    _record_outcome("a.com", THROTTLED)
+    assert not _breaker_allows("a.com")
+    assert _breaker_allows("b.com")
+
+
+def test_other_failures_do_not_count(clock):
+    _record_outcome("a.com", NOT_FOUND)
+    _record_outcome("a.com", NOT_FOUND)
+    assert _breaker_allows("a.com")
+
+
+def test_half_open_lets_exactly_one_trial_through(clock):
+    trip("a.com")
+    clock[0] += 61
+    assert _breaker_allows("a.com")
+    assert not _breaker_allows("a.com")
+    assert not _breaker_allows("a.com")
+
+
+def test_successful_trial_closes_the_breaker(clock):
+    trip("a.com")
+    clock[0] += 61
+    assert _breaker_allows("a.com")
+    _record_outcome("a.com", SUCCESS)
+    assert _breaker_allows("a.com")
+    assert _breaker_allows("a.com")
+
+
+def test_throttled_trial_reopens_for_a_full_cooldown(clock):
+    trip("a.com")
+    clock[0] += 61
+    assert _breaker_allows("a.com")
+    _record_outcome("a.com", THROTTLED)
+    clock[0] += 30
+    assert not _breaker_allows("a.com")
+    clock[0] += 31
+    assert _breaker_allows("a.com")
+
+
+def test_ended_or_abandoned_trial_frees_the_slot(clock):
+    trip("a.com")
+    clock[0] += 61
+    assert _breaker_allows("a.com")
+    _end_trial("a.com")
+    assert _breaker_allows("a.com")
+    # Trial never reports back: the slot expires after another cooldown
+    clock[0] += 61
+    assert _breaker_allows("a.com")
+
+
+def test_disabled_breaker_always_allows(clock, monkeypatch):
+    monkeypatch.setattr(extractor, "settings", extractor.settings.model_copy(
+        update={"CIRCUIT_BREAKER_THRESHOLD": 0}
+    ))
+    trip("a.com")
+    assert _breaker_allows("a.com")
+
+
+def test_result_cache_key_ignores_schema_key_order_and_query_spacing():
+    schema_a = {"type": "object", "properties": {"name": {"type": "string"}, "price": {"type": "number"}}}
+    schema_b = {"properties": {"price": {"type": "number"}, "name": {"type": "string"}}, "type": "object"}
+    assert (
+        _result_cache_key("https://a.com", "Get  Price", schema_a, "")
+        == _result_cache_key("https://a.com", "get price", schema_b, "")
+    )
@@ -0,0 +1,56 @@
+"""
+Tests for the raw-bytes JSON-LD scanner
+"""
+from extraction.structured_data_extractor import StructuredDataExtractor, iter_jsonld_blocks
+
+
+def test_yields_blocks_in_document_order():
+    html = (
+        b'<html><head>'
+        b'<script type="application/ld+json">{"@type": "Organization"}</script>'
+        b'</head><body>'
+        b'<script type="application/ld+json"> {"@type": "Product"} </script>'
+        b'</body></html>'
+    )
+    assert list(iter_jsonld_blocks(html)) == [b'{"@type": "Organization"}', b'{"@type": "Product"}']
+
+
+def test_ignores_marker_inside_inline_script_text():
+    html = (
+        b'<script>document.querySelectorAll(\'script[type="application/ld+json"]\')</script>'
+        b'<script type="application/ld+json">{"@type": "Product", "name": "Tee"}</script>'
+    )
+    assert list(iter_jsonld_blocks(html)) == [b'{"@type": "Product", "name": "Tee"}']
+
+
+def test_ignores_marker_in_body_text_and_other_tags():
+    html = (
+        b'<p>We publish application/ld+json data</p>'
+        b'<link rel="alternate" type="application/ld+json" href="/data.json">'
+        b'<script type="application/ld+json">{"@type": "Article"}</script>'
+    )
+    assert list(iter_jsonld_blocks(html)) == [b'{"@type": "Article"}']
+
+
+def test_close_tag_is_case_insensitive():
+    html = (
+        b'<SCRIPT TYPE="application/ld+json">{"@type": "Event"}</SCRIPT>'
+        b'<div></div><script></script>'
+    )
+    assert list(iter_jsonld_blocks(html)) == [b'{"@type": "Event"}']
+
+
+def test_skips_empty_and_unclosed_blocks():
+    assert list(iter_jsonld_blocks(b'<script type="application/ld+json">  </script>')) == []
+    assert list(iter_jsonld_blocks(b'<script type="application/ld+json">{"@type": "Book"}')) == []
+    assert list(iter_jsonld_blocks(b'<script type="application/ld+json"')) == []
+
+
+def test_first_relevant_jsonld_after_inline_script_mention():
+    html = (
+        b'<script>var s = "application/ld+json";</script>'
+        b'<script type="application/ld+json">{"@type": "WebSite"}</script>'
+        b'<script type="application/ld+json">{"@type": "Product", "name": "Tee"}</script>'
+    )
+    data = StructuredDataExtractor().first_relevant_jsonld(iter_jsonld_blocks(html))
+    assert data == {"@type": "Product", "name": "Tee"}
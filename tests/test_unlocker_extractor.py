@@ -0,0 +1,99 @@
+"""
+Tests for the Web Unlocker extractor: HTML pre-processing and request coalescing
+"""
+import asyncio
+
+import pytest
+
+from extraction import unlocker_extractor
+from extraction.unlocker_extractor import WebUnlockerExtractor, _strip_non_text_blocks
+from utils import TTLCache
+
+
+def test_removes_script_style_and_noscript_blocks():
+    html = (
+        b'<p>Name</p><script>var x = "<p>fake</p>";</script>'
+        b'<style>p { color: red }</style><noscript>Enable JS</noscript><p>Price</p>'
+    )
+    assert _strip_non_text_blocks(html) == b'<p>Name</p>   <p>Price</p>'
+
+
+def test_matches_tags_case_insensitively_and_keeps_original_bytes():
+    html = b'<P>Keep Me</P><SCRIPT type="text/javascript">drop()</SCRIPT ><Style>x</STYLE>'
+    assert _strip_non_text_blocks(html) == b'<P>Keep Me</P>  '
+
+
+def test_unclosed_block_runs_to_end():
+    assert _strip_non_text_blocks(b'<p>a</p><script>never closed <p>b</p>') == b'<p>a</p> '
+    assert _strip_non_text_blocks(b'<p>a</p><style>x</style') == b'<p>a</p> '
+
+
+def test_does_not_match_tag_name_prefixes():
+    html = b'<scripted>text</scripted><styles>more</styles>'
+    assert _strip_non_text_blocks(html) == html
+
+
+def test_leaves_html_without_blocks_unchanged():
+    assert _strip_non_text_blocks(b'') == b''
+    assert _strip_non_text_blocks(b'<div>plain</div>') == b'<div>plain</div>'
+
+
+@pytest.fixture
+def slow_unlocker(monkeypatch):
+    """Unlocker whose uncached extraction takes a while and counts its runs"""
+    monkeypatch.setattr(unlocker_extractor, "_result_cache", TTLCache(maxsize=8, ttl=60))
+    calls = []
+    
+    async def fake_extract_uncached(self, url):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return {"name": "Tee"}
+    
+    monkeypatch.setattr(WebUnlockerExtractor, "_extract_uncached", fake_extract_uncached)
+    unlocker = WebUnlockerExtractor(anthropic_client=None, json_schema={"properties": {"name": {}}}, query="name")
+    unlocker.api_token = "token"
+    unlocker.zone = "zone"
+    return unlocker, calls
+
+
+def test_concurrent_callers_share_one_extraction(slow_unlocker):
+    unlocker, calls = slow_unlocker
+    
+    async def run():
+        return await asyncio.gather(unlocker.extract("https://a.com"), unlocker.extract("https://a.com"))
+    
+    assert asyncio.run(run()) == [{"name": "Tee"}, {"name": "Tee"}]
+    assert calls == ["https://a.com"]
+
+
+def test_cancelling_first_caller_does_not_fail_the_second(slow_unlocker):
+    unlocker, calls = slow_unlocker
+    
+    async def run():
+        first = asyncio.create_task(unlocker.extract("https://a.com"))
+        second = asyncio.create_task(unlocker.extract("https://a.com"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+    
+    assert asyncio.run(run()) == {"name": "Tee"}
+    assert calls == ["https://a.com"]
+
+
+def test_work_is_cancelled_when_every_caller_leaves(slow_unlocker):
+    unlocker, calls = slow_unlocker
+    
+    async def run():
+        first = asyncio.create_task(unlocker.extract("https://a.com"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert not unlocker_extractor._in_flight
+        # A later caller starts fresh instead of joining the cancelled work
+        return await unlocker.extract("https://a.com")
+    
+    assert asyncio.run(run()) == {"name": "Tee"}
+    assert calls == ["https://a.com", "https://a.com"]
@@ -1,8 +1,18 @@
+import asyncio
+import json
 import logging
 import sys
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Union
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # Optional speedup, falls back to stdlib json
+    orjson = None
+
 
 # Configure logging
 def setup_logging(level: str = "INFO") -> logging.Logger:
@@ -59,6 +69,163 @@ def sanitize_url(url: str) -> str:
     return url
 
 
+def json_dumps(data: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON (orjson when available)
+
+    Args:
+        data: JSON-serializable object
+        indent: Pretty print with 2-space indentation
+        sort_keys: Sort object keys (canonical output for hashing)
+
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(data, option=option, default=str)
+
+    return json.dumps(
+        data,
+        indent=2 if indent else None,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        default=str
+    ).encode("utf-8")
+
+
+def to_json(data: Any, indent: bool = False) -> str:
+    """
+    Serialize data to a JSON string (orjson when available)
+
+    Args:
+        data: JSON-serializable object
+        indent: Pretty print with 2-space indentation
+
+    Returns:
+        JSON text
+    """
+    return json_dumps(data, indent=indent).decode("utf-8")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or bytes (orjson when available)
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        json.JSONDecodeError: If the document is invalid
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def run_blocking_input(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking prompt (input, Prompt.ask) without blocking the event loop
+
+    Uses a daemon thread rather than the default executor so an abandoned
+    prompt (e.g. after Ctrl-C) never holds up interpreter shutdown.
+
+    Args:
+        func: Blocking callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns (exceptions such as EOFError are re-raised)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter, value):
+        if not future.done():
+            setter(value)
+
+    def worker():
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            callback = (resolve, future.set_exception, e)
+        else:
+            callback = (resolve, future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(*callback)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    threading.Thread(target=worker, daemon=True).start()
+    return await future
+
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop as the asyncio event loop policy when it is installed
+
+    Returns:
+        True if uvloop was installed
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after a fixed TTL
+
+    Args:
+        maxsize: Maximum number of entries (least recently used are evicted)
+        ttl: Seconds an entry stays valid (0 disables caching)
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        if self.ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 def format_timestamp(dt: datetime = None) -> str:
     """
     Format datetime for logging/output